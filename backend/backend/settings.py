@@ -41,6 +41,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'myapp.middleware.jwt_authentication_middleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -118,10 +119,32 @@ DATABASES = {
         'HOST': os.getenv('HOST'),
         'PORT' : '6543',
         'POOL_MODE' : 'transaction',
+        # pgbouncer mode transaction tidak mendukung server-side cursor (.iterator())
+        'DISABLE_SERVER_SIDE_CURSORS': True,
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Default locmem (per proses). Set CACHE_LOCATION ke sebuah folder untuk memakai
+# file cache bersama antar worker, supaya invalidasi dashboard berlaku di semua proses.
+
+if os.getenv('CACHE_LOCATION'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_LOCATION'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -7,9 +7,10 @@ from .views.admin_cluster import cluster
 from .views.admin_branch import branch
 from .views.admin_region import region
 from .views.admin_area import area
-from .views.marketingfee import marketingfee, recommendation, get_marketing_fee, get_monthly_marketing_fee, submit_marketing_fee
-from .views.report import create_report, delete_report
-from .views.approve import batch_approve_reports
+from .views.marketingfee import marketingfee, recommendation, get_marketing_fee, get_monthly_marketing_fee, submit_marketing_fee, bulk_submit_marketing_fee
+from .views.report import create_report, delete_report, start_report_upload, report_upload, finalize_report_upload
+from .views.approve import batch_approve_reports, scope_approve_reports
+from .views.pending_approvals import pending_approvals
 from .views.locations import get_areas, get_regions, get_branches, get_clusters
 from .views.user_dashboard import user_dashboard
 from .views.admin_area_dashboard import admin_area_dashboard
@@ -25,6 +26,10 @@ from .views import admin_cluster_region
 from .views.user_evidence import user_evidence
 from .views.recommendations import create_recommendation, get_recommendation
 from .views.show_image import get_image
+from .views.media import media_file
+from .views.export import export_reports
+from .views.report_list import user_reports, cluster_reports
+from .views.timeseries import report_timeseries
 
 urlpatterns = [
     # register api for user (SBP)
@@ -66,10 +71,17 @@ urlpatterns = [
     # report
     path('api/report/create/', create_report, name='create_report'),
     path('api/report/delete/<int:report_id>/', delete_report, name='delete_report'),  
+    path('api/report/uploads/', start_report_upload, name='start_report_upload'),
+    path('api/report/uploads/<uuid:upload_id>/', report_upload, name='report_upload'),
+    path('api/report/uploads/<uuid:upload_id>/finalize/', finalize_report_upload, name='finalize_report_upload'),
     path('api/report/overview/', report_overview, name='report_overview'),
+    path('api/reports/user/<int:user_id>/', user_reports, name='user_reports'),
+    path('api/reports/cluster/<int:cluster_id>/', cluster_reports, name='cluster_reports'),
     
     #approved
     path('api/approve/', batch_approve_reports, name='approve_reports'),
+    path('api/approve/scope/', scope_approve_reports, name='scope_approve_reports'),
+    path('api/approvals/pending/<str:scope>/<str:scope_id>/', pending_approvals, name='pending_approvals'),
 
     path('api/locations/areas/', get_areas, name='get_areas'),
     path('api/locations/regions/<str:area_id>/', get_regions, name='get_regions'),
@@ -133,6 +145,14 @@ urlpatterns = [
     path('api/recommendations/<str:cluster_id>/<str:poin_id>', get_recommendation, name='get_recommendation'),
 
     path('api/marketing-fee/submit', submit_marketing_fee, name='submit_marketing_fee'),
+    path('api/marketing-fee/bulk', bulk_submit_marketing_fee, name='bulk_submit_marketing_fee'),
     
     path('api/show-image', get_image, name='get_image'),
+    path('api/media/<path:file_path>', media_file, name='media_file'),
+
+    # export CSV report per area/region/branch/cluster
+    path('api/export/reports/<str:scope>/<str:scope_id>/', export_reports, name='export_reports'),
+
+    # seri waktu pemakaian per hari/minggu/bulan untuk chart
+    path('api/timeseries/<str:scope>/<str:scope_id>/', report_timeseries, name='report_timeseries'),
 ]
\ No newline at end of file
@@ -1,10 +1,16 @@
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from myapp.models import Branch, Cluster, Report, User, Marketingfee
+from myapp.models import Branch, Report
+from myapp.refdata import get_branch, list_clusters
+from myapp.periods import parse_month, period_filter, year_range
+from myapp.timeseries import chart_data, report_series
+from myapp.dashboard_cache import get_or_build
+from myapp.conditional import dashboard_condition
 from django.db.models import Sum
 from datetime import datetime
 
 @csrf_exempt
+@dashboard_condition('admin_branch', 'branch', 'branch_id')
 def admin_branch_dashboard(request, branch_id):
     try:
         print(f"Processing request for branch_id: {branch_id}")
@@ -16,74 +22,26 @@ def admin_branch_dashboard(request, branch_id):
         print(f"Request params - month: {month}, year: {year}")
         
         # Convert month name to number
-        month_map = {
-            'Januari': 1, 'Februari': 2, 'Maret': 3, 'April': 4,
-            'Mei': 5, 'Juni': 6, 'Juli': 7, 'Agustus': 8,
-            'September': 9, 'Oktober': 10, 'November': 11, 'Desember': 12
-        }
-        month_number = month_map.get(month, datetime.now().month)
+        month_number = parse_month(month)
         year_number = int(year) if year.isdigit() else datetime.now().year
 
         # Get branch data
-        branch = Branch.objects.get(id_branch=branch_id)
+        branch = get_branch(branch_id)
+        if branch is None:
+            raise Branch.DoesNotExist
         
         # Get clusters in this branch
-        clusters = Cluster.objects.filter(id_branch=branch_id)
+        clusters = list_clusters(branch_id)
         
-        if not clusters.exists():
+        if not clusters:
             return JsonResponse({
                 "error": f"No clusters found for branch {branch_id}"
             }, status=404)
         
-        clusters_data = []
-        total_branch_usage = 0
-        
-        for cluster in clusters:
-            users = User.objects.filter(id_cluster=cluster.id_cluster)
-            
-            # Calculate total usage for this cluster
-            total_usage = Report.objects.filter(
-                id_user__in=users.values('id_user'),
-                time__month=month_number,
-                time__year=year_number
-            ).aggregate(
-                total=Sum('amount_used')
-            )['total'] or 0
-            
-            total_branch_usage += total_usage
-            
-            clusters_data.append({
-                "id_cluster": cluster.id_cluster,
-                "name": cluster.cluster,
-                "totalUsage": total_usage,
-                "percentage": 0  # Will be calculated after total is known
-            })
-        
-        # Calculate percentages
-        for cluster in clusters_data:
-            cluster["percentage"] = (
-                (cluster["totalUsage"] / total_branch_usage * 100) 
-                if total_branch_usage > 0 else 0
-            )
-        
-        response_data = {
-            "branchName": branch.branch,
-            "overview": {
-                "total_amount": total_branch_usage,
-                "total_reports": Report.objects.filter(
-                    id_user__in=User.objects.filter(
-                        id_cluster__in=clusters.values('id_cluster')
-                    ).values('id_user'),
-                    time__month=month_number,
-                    time__year=year_number
-                ).count()
-            },
-            "clusters": clusters_data,
-            "monthlyData": {
-                "labels": [],
-                "datasets": []
-            }
-        }
+        response_data = get_or_build(
+            'admin_branch', 'branch', int(branch_id), year_number, month_number,
+            lambda: _build_branch_dashboard(branch, clusters, year_number, month_number)
+        )
         
         print(f"Sending response: {response_data}")
         return JsonResponse(response_data)
@@ -96,17 +54,57 @@ def admin_branch_dashboard(request, branch_id):
         print(f"Error in admin_branch_dashboard: {str(e)}")
         return JsonResponse({"error": str(e)}, status=500)
 
-def get_monthly_data(year):
-    # Implementasi logika untuk mendapatkan data bulanan
-    # Sesuaikan dengan kebutuhan
-    return {
-        'labels': ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'],
-        'datasets': [
-            {
-                'label': 'Marketing Fee',
-                'data': [0] * 12,  # Isi dengan data sebenarnya
-                'borderColor': '#FF4B2B',
-                'backgroundColor': 'rgba(255, 75, 43, 0.1)',
-            }
-        ]
-    } 
\ No newline at end of file
+def _build_branch_dashboard(branch, clusters, year_number, month_number):
+    cluster_ids = [cluster['id_cluster'] for cluster in clusters]
+    clusters_data = []
+    total_branch_usage = 0
+    
+    # Calculate total usage per cluster
+    usage_by_cluster = {
+        row['id_user__id_cluster']: row['total']
+        for row in Report.objects.filter(
+            id_user__id_cluster__in=cluster_ids,
+            **period_filter(year_number, month_number)
+        ).values('id_user__id_cluster').annotate(
+            total=Sum('amount_used')
+        )
+    }
+    
+    for cluster in clusters:
+        total_usage = usage_by_cluster.get(cluster['id_cluster']) or 0
+        
+        total_branch_usage += total_usage
+        
+        clusters_data.append({
+            "id_cluster": cluster['id_cluster'],
+            "name": cluster['cluster'],
+            "totalUsage": total_usage,
+            "percentage": 0  # Will be calculated after total is known
+        })
+    
+    # Calculate percentages
+    for cluster in clusters_data:
+        cluster["percentage"] = (
+            (cluster["totalUsage"] / total_branch_usage * 100) 
+            if total_branch_usage > 0 else 0
+        )
+    
+    response_data = {
+        "branchName": branch['name'],
+        "overview": {
+            "total_amount": total_branch_usage,
+            "total_reports": Report.objects.filter(
+                id_user__id_cluster__in=cluster_ids,
+                **period_filter(year_number, month_number)
+            ).count()
+        },
+        "clusters": clusters_data,
+        # Seri bulanan setahun semua cluster di branch ini
+        "monthlyData": chart_data(
+            report_series(*year_range(year_number), 'month', cluster_ids=cluster_ids),
+            'month',
+            'Marketing Fee'
+        )
+    }
+
+    return response_data
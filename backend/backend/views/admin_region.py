@@ -1,7 +1,7 @@
-import requests
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
 from myapp.models import User
+from myapp.services import region_summary, branch_summary, cluster_detail
 
 @csrf_exempt
 def region(request, id_region=None,id_branch=None,id_cluster=None,id_poin=None):
@@ -9,38 +9,31 @@ def region(request, id_region=None,id_branch=None,id_cluster=None,id_poin=None):
     year = request.GET.get('year') 
 
     if id_region:
-        try:
-            region_admin = User.objects.get(id_user=id_region, id_role__in=[2])
-        except User.DoesNotExist:
-            return JsonResponse({'error': 'Region admin not found'}, status=404)
-        
         if not id_branch and not id_cluster: 
-            list_branch = list(User.objects.filter(id_region=region_admin.id_region, id_role=3).values('id_user', 'username')) 
+            try:
+                return JsonResponse(region_summary(id_region))
+            except User.DoesNotExist:
+                return JsonResponse({'error': 'Region admin not found'}, status=404)
 
-            return JsonResponse({
-                "data_admin" : {
-                    "id_user" : region_admin.id_user,
-                    "username" : region_admin.username
-                },
-                "list_branch" : list_branch})
+        if not User.objects.filter(id_user=id_region, id_role__in=[2]).exists():
+            return JsonResponse({'error': 'Region admin not found'}, status=404)
         
-        elif id_branch and not id_cluster:
-            branch_admin = User.objects.get(id_user=id_branch, id_role__in=[3])
-
-            base_url = 'http://127.0.0.1:8000/api/admin/branch/{}/'
-            response = requests.get(base_url.format(id_branch), timeout=5)  
-            cluster_list = response.json()
+        if id_branch and not id_cluster:
+            try:
+                cluster_list = branch_summary(id_branch)
+            except User.DoesNotExist:
+                return JsonResponse({'error': 'Branch admin not found'}, status=404)
 
             return JsonResponse({
-                "data_admin" : {
-                    "id_user" : branch_admin.id_user,
-                    "username" : branch_admin.username
-                },
+                "data_admin" : cluster_list["data_admin"],
                 "list_cluster" : cluster_list})
         
         elif id_branch and id_cluster and id_poin:
-            base_url = f"http://127.0.0.1:8000/api/admin/branch/{id_branch}/cluster/{id_cluster}/{id_poin}?month={month}&year={year}"
-            response = requests.get(base_url, timeout=5)
-            if response.status_code == 200:
-                cluster_info = response.json()
+            try:
+                cluster_info = cluster_detail(id_cluster, month, year, id_poin=id_poin)
                 return JsonResponse(cluster_info, safe=False)
+            except User.DoesNotExist:
+                return JsonResponse({"error": "Admin cluster not found"}, status=404)
+            except Exception as e:
+                print(f"Error in region view: {str(e)}")
+                return JsonResponse({"error": str(e)}, status=500)
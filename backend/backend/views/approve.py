@@ -1,47 +1,40 @@
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
-from myapp.models import Report
+from django.db import transaction
+from myapp.approvals import approve_reports
+from myapp.periods import month_range
+from myapp.refdata import clusters_in_scope
 import json
-from datetime import datetime
-import calendar
 
 @csrf_exempt
 def batch_approve_reports(request):
     """Fungsi untuk approve laporan secara batch tanpa autentikasi"""
     if request.method != 'POST':
         return JsonResponse({'error': 'Method not allowed'}, status=405)
-    
+
     try:
         data = json.loads(request.body)
-        user_id = data.get('user_id')
-        year = int(data.get('year'))
-        month = int(data.get('month'))
-        
+        try:
+            user_id = int(data.get('user_id'))
+            year = int(data.get('year'))
+            month = int(data.get('month'))
+        except (TypeError, ValueError):
+            return JsonResponse({'error': 'user_id, year and month must be numbers'}, status=400)
+
         # Validasi bulan
         if not (1 <= month <= 12):
             return JsonResponse({'error': 'Invalid month'}, status=400)
-        
-        # Tentukan rentang tanggal awal & akhir bulan
-        first_day = datetime(year, month, 1)
-        last_day = datetime(year, month, calendar.monthrange(year, month)[1], 23, 59, 59)
-        
-        # Ambil laporan yang belum di-approve
-        reports = Report.objects.filter(
-            id_user=user_id,
-            time__gte=first_day,
-            time__lte=last_day,
-            status=False
-        )
-        
-        count = reports.count()
+
+        # Approve laporan yang belum di-approve pada bulan tersebut
+        start, end = month_range(year, month)
+        current_time = timezone.now()
+        with transaction.atomic():
+            counts = approve_reports(current_time, user_ids=[user_id], start=start, end=end)
+        count = sum(counts.values())
         if count == 0:
             return JsonResponse({'message': 'No pending reports found for this period'})
-        
-        # Update status laporan
-        current_time = timezone.now()
-        reports.update(status=True, approved_at=current_time)
-        
+
         return JsonResponse({
             'message': 'Reports approved successfully',
             'data': {
@@ -52,8 +45,65 @@ def batch_approve_reports(request):
                 'approved_at': current_time.isoformat()
             }
         })
-        
+
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON format'}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@csrf_exempt
+def scope_approve_reports(request):
+    """Approve semua report pending di satu scope sekaligus.
+
+    Body JSON salah satu dari:
+    - {"report_ids": [...]}
+    - {"cluster_ids": [...], "year": ..., "month": ...}
+    - {"scope": "cluster"|"branch"|"region"|"area", "scope_id": ..., "year": ..., "month": ...}
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        data = json.loads(request.body)
+        current_time = timezone.now()
+
+        if 'report_ids' in data:
+            report_ids = [int(id_report) for id_report in data['report_ids']]
+            with transaction.atomic():
+                counts = approve_reports(current_time, report_ids=report_ids)
+        else:
+            if 'cluster_ids' in data:
+                cluster_ids = [int(id_cluster) for id_cluster in data['cluster_ids']]
+            else:
+                cluster_ids = clusters_in_scope(data.get('scope'), data.get('scope_id'))
+                if cluster_ids is None:
+                    return JsonResponse({'error': f"Invalid scope: {data.get('scope')}"}, status=400)
+
+            year = int(data.get('year'))
+            month = int(data.get('month'))
+            if not (1 <= month <= 12):
+                return JsonResponse({'error': 'Invalid month'}, status=400)
+
+            start, end = month_range(year, month)
+            with transaction.atomic():
+                counts = approve_reports(current_time, cluster_ids=cluster_ids, start=start, end=end)
+
+        return JsonResponse({
+            'message': 'Reports approved successfully',
+            'data': {
+                'approved_count': sum(counts.values()),
+                'clusters': [
+                    {'id_cluster': id_cluster, 'approved_count': count}
+                    for id_cluster, count in sorted(counts.items(), key=lambda item: item[0] or 0)
+                ],
+                'approved_at': current_time.isoformat()
+            }
+        })
+
     except json.JSONDecodeError:
         return JsonResponse({'error': 'Invalid JSON format'}, status=400)
+    except (TypeError, ValueError):
+        return JsonResponse({'error': 'Invalid approval request'}, status=400)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
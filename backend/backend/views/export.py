@@ -0,0 +1,63 @@
+import csv
+from datetime import datetime, timedelta
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from myapp.export import CSV_HEADER, iter_report_rows
+from myapp.periods import month_range, parse_month
+from myapp.refdata import clusters_in_scope
+
+
+class Echo:
+    """Objek mirip file untuk csv.writer: write() langsung mengembalikan barisnya."""
+
+    def write(self, value):
+        return value
+
+
+def _export_period(request):
+    # Rentang tanggal (start/end, inklusif) atau satu bulan (month/year)
+    start = request.GET.get('start')
+    end = request.GET.get('end')
+    if start and end:
+        start_date = datetime.strptime(start, '%Y-%m-%d')
+        end_date = datetime.strptime(end, '%Y-%m-%d') + timedelta(days=1)
+        return timezone.make_aware(start_date), timezone.make_aware(end_date)
+
+    year = request.GET.get('year', '')
+    year = int(year) if year.isdigit() else datetime.now().year
+    return month_range(year, parse_month(request.GET.get('month')))
+
+
+@csrf_exempt
+def export_reports(request, scope, scope_id):
+    """Export report satu area/region/branch/cluster ke CSV secara streaming"""
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        cluster_ids = clusters_in_scope(scope, scope_id)
+        if cluster_ids is None or not scope_id.isdigit():
+            return JsonResponse({'error': f'Invalid scope: {scope}/{scope_id}'}, status=400)
+
+        try:
+            start, end = _export_period(request)
+        except ValueError as e:
+            return JsonResponse({'error': f'Invalid period: {str(e)}'}, status=400)
+
+        writer = csv.writer(Echo())
+
+        def rows():
+            yield writer.writerow(CSV_HEADER)
+            for row in iter_report_rows(cluster_ids, start, end):
+                yield writer.writerow(row)
+
+        last_day = end - timedelta(days=1)
+        filename = f"reports_{scope}_{scope_id}_{start:%Y%m%d}_{last_day:%Y%m%d}.csv"
+        response = StreamingHttpResponse(rows(), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    except Exception as e:
+        print(f"Error in export_reports: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
@@ -1,20 +1,17 @@
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from myapp.models import User
+from myapp import refdata
 
 @csrf_exempt
 def get_cluster_user(request, cluster_id):
     try:
         print(f"Searching cluster user for cluster_id: {cluster_id}")
         
-        # Cari user cluster (id_user 6xxx) di cluster tersebut
-        user = User.objects.filter(
-            id_cluster=cluster_id,
-            id_user__gte=6000,  # ID user cluster dimulai dari 6000
-            id_user__lt=7000    # Sampai sebelum 7000
-        ).first()
-
-        if not user:
+        # Cari user cluster (id_user 6xxx, id_role=6) di cluster tersebut
+        try:
+            user = refdata.get_cluster_user(cluster_id)
+        except User.DoesNotExist:
             print(f"No user found for cluster_id: {cluster_id}")
             return JsonResponse({
                 'error': 'Cluster user not found'
@@ -1,52 +1,57 @@
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from myapp.models import Area, Region, Branch, Cluster, User
+from myapp.refdata import list_areas, list_regions, list_branches, list_clusters
+from myapp.conditional import refdata_condition
 import logging
 
 logger = logging.getLogger(__name__)
 
+@refdata_condition('areas')
 def get_areas(request):
     try:
         logger.info('Fetching areas')
-        areas = Area.objects.all().values('id_area', 'area')
+        areas = list_areas()
         logger.info(f'Found {len(areas)} areas')
-        return JsonResponse(list(areas), safe=False)
+        return JsonResponse(areas, safe=False)
     except Exception as e:
         logger.error(f'Error fetching areas: {str(e)}')
         return JsonResponse({'error': str(e)}, status=500)
 
+@refdata_condition('regions')
 def get_regions(request, area_id):
     try:
         logger.info(f'Fetching regions for area {area_id}')
-        regions = Region.objects.filter(id_area=area_id).values('id_region', 'region')
+        regions = list_regions(area_id)
         logger.info(f'Found {len(regions)} regions')
-        return JsonResponse(list(regions), safe=False)
+        return JsonResponse(regions, safe=False)
     except Exception as e:
         logger.error(f'Error fetching regions: {str(e)}')
         return JsonResponse({'error': str(e)}, status=500)
 
+@refdata_condition('branches')
 def get_branches(request, region_id):
     try:
         logger.info(f'Fetching branches for region {region_id}')
-        branches = Branch.objects.filter(id_region=region_id).values('id_branch', 'branch')
+        branches = list_branches(region_id)
         logger.info(f'Found {len(branches)} branches')
-        return JsonResponse(list(branches), safe=False)
+        return JsonResponse(branches, safe=False)
     except Exception as e:
         logger.error(f'Error fetching branches: {str(e)}')
         return JsonResponse({'error': str(e)}, status=500)
 
 @csrf_exempt
+@refdata_condition('clusters')
 def get_clusters(request, branch_id):
     try:
         # Log untuk debugging
         print(f"Fetching clusters for branch_id: {branch_id}")
         
-        clusters = Cluster.objects.filter(id_branch=branch_id).values('id_cluster', 'cluster')
+        clusters = list_clusters(branch_id)
         
         # Log hasil query
-        print(f"Found clusters: {list(clusters)}")
+        print(f"Found clusters: {clusters}")
         
-        return JsonResponse(list(clusters), safe=False)
+        return JsonResponse(clusters, safe=False)
         
     except Exception as e:
         print(f"Error in get_clusters: {str(e)}")
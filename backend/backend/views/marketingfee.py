@@ -2,11 +2,18 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
-from myapp.models import Recommendation, Marketingfee, User, Poin, Report
+from myapp.models import Recommendation, User, Report
+from myapp.refdata import get_cluster_user, get_refdata, poin_types
+from myapp.periods import parse_month, period_filter, period_key, month_range
+from myapp.dashboard_cache import invalidate_users
+from myapp.marketing_fees import upsert_month_fees
+from myapp.timeseries import bucket_label, report_series
+from datetime import datetime
+import csv
+import io
 import json
 from django.db.models import Sum
-from datetime import datetime
-from django.db import connection
+from django.db import transaction
 
 
 @csrf_exempt
@@ -21,50 +28,69 @@ def recommendation(request, id_user):
             if not recommendations or not isinstance(recommendations, list):
                 return JsonResponse({"status": "error", "message": "Recommendations must be provided as a list"}, status=400)
 
-            # Set poin yang wajib diisi
-            required_poin_ids = set(range(1, 8))  # {1, 2, 3, 4, 5, 6, 7}
+            # Poin yang wajib diisi: semua tipe poin di data referensi
+            required_poin_ids = {poin['id_poin'] for poin in poin_types()}
             provided_poin_ids = set()
 
-            user = get_object_or_404(User, id_user=id_user)
-            created_recommendations = []
-
-            # Loop melalui setiap item dalam 'recommendations'
+            # Validasi seluruh batch dulu sebelum ada yang ditulis
             for rec in recommendations:
+                if not isinstance(rec, dict):
+                    return JsonResponse({"status": "error", "message": "Each recommendation must be an object"}, status=400)
+
                 id_poin = rec.get("id_poin")
                 recommend = rec.get("recommend")
 
                 if not id_poin or recommend is None:
                     return JsonResponse({"status": "error", "message": "Each recommendation must include 'id_poin' and 'recommend'"}, status=400)
 
-                # Menambahkan id_poin yang ada ke dalam set provided_poin_ids
+                try:
+                    id_poin = int(id_poin)
+                except (TypeError, ValueError):
+                    return JsonResponse({"status": "error", "message": f"Invalid poin: {id_poin}"}, status=400)
+
+                if id_poin not in required_poin_ids:
+                    return JsonResponse({"status": "error", "message": f"Invalid poin: {id_poin}"}, status=400)
+                if id_poin in provided_poin_ids:
+                    return JsonResponse({"status": "error", "message": f"Duplicate poin: {id_poin}"}, status=400)
+
                 provided_poin_ids.add(id_poin)
 
-                # Memastikan id_poin valid dan ada di database
-                poin = get_object_or_404(Poin, id_poin=id_poin)
-
-                recommendation_entry = Recommendation.objects.create(
-                    id_user=user,
-                    id_poin=poin,
-                    recommend=recommend,
-                    time=timezone.now()
-                )
-
-                created_recommendations.append({
-                    "id": recommendation_entry.id,
-                    "id_user": recommendation_entry.id_user.id_user,
-                    "id_poin": recommendation_entry.id_poin.id_poin,
-                    "time": recommendation_entry.time,
-                    "recommend": recommendation_entry.recommend
-                })
-
-            # Memastikan semua id_poin dari 1 sampai 7 ada
+            # Memastikan semua poin ada
             if not provided_poin_ids == required_poin_ids:
                 missing_poin = required_poin_ids - provided_poin_ids
                 return JsonResponse({
                     "status": "error",
-                    "message": f"Missing required points: {', '.join(map(str, missing_poin))}"
+                    "message": f"Missing required points: {', '.join(map(str, sorted(missing_poin)))}"
                 }, status=400)
 
+            user = get_object_or_404(User, id_user=id_user)
+            now = timezone.now()
+            period = period_key(timezone.localtime(now).year, timezone.localtime(now).month)
+
+            # Semua baris ditulis dengan satu INSERT ... ON CONFLICT dalam satu transaksi,
+            # rekomendasi yang sudah ada bulan ini di-update
+            with transaction.atomic():
+                created = Recommendation.objects.bulk_create([
+                    Recommendation(
+                        id_user=user,
+                        id_poin_id=int(rec["id_poin"]),
+                        recommend=rec["recommend"],
+                        time=now,
+                        period=period
+                    )
+                    for rec in recommendations
+                ], update_conflicts=True, unique_fields=['id_user', 'id_poin', 'period'], update_fields=['recommend', 'time'])
+                # bulk_create tidak memicu signal post_save
+                invalidate_users([user.id_user])
+
+            created_recommendations = [{
+                "id": recommendation_entry.id,
+                "id_user": user.id_user,
+                "id_poin": recommendation_entry.id_poin_id,
+                "time": recommendation_entry.time,
+                "recommend": recommendation_entry.recommend
+            } for recommendation_entry in created]
+
             # Menyusun response dengan data rekomendasi yang berhasil dibuat
             return JsonResponse({
                 "status": "success",
@@ -91,22 +117,22 @@ def marketingfee(request, id_user):
 
             user = get_object_or_404(User, id_user=id_user)
 
-            marketing_fee = Marketingfee.objects.create(
-                id_user=user,
-                total=total,
-                time=timezone.now()
-            )
+            # Satu marketing fee per user per bulan, submit ulang meng-update bulan ini
+            now = timezone.localtime()
+            result = upsert_month_fees([(user.id_user, user.id_cluster_id, total)], now.year, now.month)
+            marketing_fee_id, status = result[user.id_user]
+            period_start, _ = month_range(now.year, now.month)
 
             return JsonResponse({
                 "status": "success",
                 "message": "Marketing fee recorded successfully",
                 "data": {
-                    "id": marketing_fee.id,
-                    "id_user": marketing_fee.id_user.id_user,
-                    "time": marketing_fee.time,
-                    "total": marketing_fee.total
+                    "id": marketing_fee_id,
+                    "id_user": user.id_user,
+                    "time": period_start,
+                    "total": total
                 }
-            }, status=201)
+            }, status=201 if status == 'created' else 200)
 
         except json.JSONDecodeError:
             return JsonResponse({"status": "error", "message": "Invalid JSON format"}, status=400)
@@ -117,23 +143,6 @@ def marketingfee(request, id_user):
     return JsonResponse({"status": "error", "message": "Method not allowed"}, status=405)
 
 
-def getMonthNumber(month):
-    months = {
-        'Januari': 1,
-        'Februari': 2,
-        'Maret': 3,
-        'April': 4,
-        'Mei': 5,
-        'Juni': 6,
-        'Juli': 7,
-        'Agustus': 8,
-        'September': 9,
-        'Oktober': 10,
-        'November': 11,
-        'Desember': 12
-    }
-    return months.get(month, datetime.now().month)
-
 @csrf_exempt
 def get_marketing_fee(request, user_id):
     try:
@@ -142,8 +151,7 @@ def get_marketing_fee(request, user_id):
 
         reports = Report.objects.filter(
             id_user=user_id,
-            time__month=getMonthNumber(month),
-            time__year=year
+            **period_filter(year, parse_month(month))
         )
 
         total_fee = reports.aggregate(total=Sum('amount_used'))['total'] or 0
@@ -162,19 +170,14 @@ def get_monthly_marketing_fee(request, user_id):
         month = request.GET.get('month')
         year = request.GET.get('year')
 
-        # Get daily reports for the month
-        reports = Report.objects.filter(
-            id_user=user_id,
-            time__month=getMonthNumber(month),
-            time__year=year
-        ).values('time__date').annotate(
-            amount=Sum('amount_used')
-        ).order_by('time__date')
+        # Total per hari dihitung di database, semua hari dalam bulan (0 jika tidak ada report)
+        year_number = int(year) if year and str(year).isdigit() else datetime.now().year
+        series = report_series(*month_range(year_number, parse_month(month)), 'day', user_ids=[user_id])
 
         daily_data = [{
-            'date': report['time__date'].strftime('%d %B'),
-            'amount': report['amount']
-        } for report in reports]
+            'date': bucket_label(bucket, 'day'),
+            'amount': total
+        } for bucket, total, _ in series]
 
         return JsonResponse(daily_data, safe=False)
 
@@ -202,63 +205,33 @@ def submit_marketing_fee(request):
             }, status=400)
             
         # Convert month name to number if needed
-        months = {
-            'Januari': 1, 'Februari': 2, 'Maret': 3, 'April': 4,
-            'Mei': 5, 'Juni': 6, 'Juli': 7, 'Agustus': 8,
-            'September': 9, 'Oktober': 10, 'November': 11, 'Desember': 12
-        }
-        month_number = int(month) if month.isdigit() else months.get(month, datetime.now().month)
+        month_number = parse_month(month)
         year_number = int(year)
         
         # Get user from cluster first
         try:
-            cluster_user = User.objects.get(
-                id_cluster=cluster_id,
-                id_role=6
-            )
+            cluster_user = get_cluster_user(cluster_id)
             print(f"Found cluster user: {cluster_user.id_user}")
             
         except User.DoesNotExist:
             return JsonResponse({'error': 'Cluster user not found'}, status=404)
             
-        # Cek apakah sudah ada marketing fee untuk bulan dan tahun ini
-        try:
-            with connection.cursor() as cursor:
-                # Cari marketing fee yang sudah ada
-                cursor.execute(
-                    'SELECT id FROM "MarketingFee" WHERE id_user = %s AND EXTRACT(MONTH FROM time) = %s AND EXTRACT(YEAR FROM time) = %s',
-                    [cluster_user.id_user, month_number, year_number]
-                )
-                existing_fee = cursor.fetchone()
-                
-                if existing_fee:
-                    # Update marketing fee yang sudah ada
-                    cursor.execute(
-                        'UPDATE "MarketingFee" SET total = %s, time = %s WHERE id = %s RETURNING id',
-                        [float(amount), timezone.now(), existing_fee[0]]
-                    )
-                    marketing_fee_id = existing_fee[0]
-                    print(f"Updated marketing fee with ID: {marketing_fee_id}")
-                else:
-                    # Buat marketing fee baru
-                    cursor.execute(
-                        'INSERT INTO "MarketingFee" (id_user, total, time) VALUES (%s, %s, %s) RETURNING id',
-                        [cluster_user.id_user, float(amount), timezone.now()]
-                    )
-                    marketing_fee_id = cursor.fetchone()[0]
-                    print(f"Created new marketing fee with ID: {marketing_fee_id}")
-                
-            return JsonResponse({
-                'message': 'Marketing fee saved successfully',
-                'data': {
-                    'id': marketing_fee_id,
-                    'total': float(amount)
-                }
-            })
+        # Update marketing fee bulan ini jika sudah ada, insert jika belum
+        result = upsert_month_fees(
+            [(cluster_user.id_user, int(cluster_id), float(amount))],
+            year_number,
+            month_number
+        )
+        marketing_fee_id, status = result[cluster_user.id_user]
+        print(f"Marketing fee {status} with ID: {marketing_fee_id}")
             
-        except Exception as e:
-            print(f"Error handling marketing fee: {str(e)}")
-            raise
+        return JsonResponse({
+            'message': 'Marketing fee saved successfully',
+            'data': {
+                'id': marketing_fee_id,
+                'total': float(amount)
+            }
+        })
             
     except Exception as e:
         print(f"Error in submit_marketing_fee: {str(e)}")
@@ -266,3 +239,87 @@ def submit_marketing_fee(request):
             'error': str(e),
             'detail': 'Failed to process marketing fee submission'
         }, status=500)
+
+
+def _parse_bulk_fees(request):
+    """Ambil (month, year, [{clusterId, amount}]) dari body JSON atau upload CSV"""
+    if request.content_type == 'application/json':
+        data = json.loads(request.body)
+        return data.get('month'), data.get('year'), data.get('fees') or []
+
+    # CSV: file `file` (multipart) atau body text/csv, kolom cluster dan amount
+    if request.FILES.get('file'):
+        content = request.FILES['file'].read().decode('utf-8-sig')
+        params = request.POST
+    else:
+        content = request.body.decode('utf-8-sig')
+        params = request.GET
+
+    fees = [{
+        'clusterId': row.get('clusterId') or row.get('cluster') or row.get('id_cluster'),
+        'amount': row.get('amount')
+    } for row in csv.DictReader(io.StringIO(content))]
+    return params.get('month'), params.get('year'), fees
+
+
+@csrf_exempt
+def bulk_submit_marketing_fee(request):
+    """Simpan marketing fee satu bulan untuk banyak cluster sekaligus"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        try:
+            month, year, fees = _parse_bulk_fees(request)
+        except (json.JSONDecodeError, UnicodeDecodeError, csv.Error) as e:
+            return JsonResponse({'error': f'Invalid input: {str(e)}'}, status=400)
+
+        if not all([month, year]) or not isinstance(fees, list) or not fees:
+            return JsonResponse({'error': 'Missing required fields'}, status=400)
+
+        month_number = parse_month(month)
+        year_number = int(year)
+
+        # Cluster -> user biasa dari data referensi, tanpa query per baris
+        cluster_users = get_refdata().cluster_users
+
+        results = []
+        rows = []
+        seen_users = set()
+        for index, fee in enumerate(fees):
+            cluster_id = fee.get('clusterId') if isinstance(fee, dict) else None
+            amount = fee.get('amount') if isinstance(fee, dict) else None
+            result = {'row': index + 1, 'clusterId': cluster_id, 'amount': amount}
+            results.append(result)
+
+            try:
+                cluster_id = int(cluster_id)
+                amount = float(amount)
+            except (TypeError, ValueError):
+                result.update(status='error', error='Invalid clusterId or amount')
+                continue
+
+            cluster_user = cluster_users.get(cluster_id)
+            if cluster_user is None:
+                result.update(status='error', error='Cluster user not found')
+            elif cluster_user.id_user in seen_users:
+                result.update(status='error', error='Duplicate cluster')
+            else:
+                seen_users.add(cluster_user.id_user)
+                result['id_user'] = cluster_user.id_user
+                rows.append((cluster_user.id_user, cluster_id, amount))
+
+        saved = upsert_month_fees(rows, year_number, month_number)
+        for result in results:
+            if 'id_user' in result:
+                marketing_fee_id, status = saved[result.pop('id_user')]
+                result.update(status=status, id=marketing_fee_id)
+
+        return JsonResponse({
+            'message': f'{len(saved)} marketing fee saved',
+            'data': results
+        })
+
+    except Exception as e:
+        print(f"Error in bulk_submit_marketing_fee: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
@@ -0,0 +1,13 @@
+from django.http import JsonResponse
+from myapp.media import serve_media
+
+
+def media_file(request, file_path):
+    """File evidence/thumbnail; file_path sama dengan image_url (relatif ke MEDIA_URL)"""
+    if request.method not in ('GET', 'HEAD'):
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    response = serve_media(request, file_path)
+    if response is None:
+        return JsonResponse({'error': 'File not found'}, status=404)
+    return response
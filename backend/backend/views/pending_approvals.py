@@ -0,0 +1,33 @@
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from myapp.pending_reports import pending_count, pending_page
+from myapp.refdata import clusters_in_scope
+from myapp.report_pages import parse_limit
+
+
+@csrf_exempt
+def pending_approvals(request, scope, scope_id):
+    """Antrian report pending satu area/region/branch/cluster, dipaginasi dengan ?limit= dan ?cursor="""
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        cluster_ids = clusters_in_scope(scope, scope_id)
+        if cluster_ids is None or not scope_id.isdigit():
+            return JsonResponse({'error': f'Invalid scope: {scope}/{scope_id}'}, status=400)
+
+        try:
+            page = pending_page(
+                cluster_ids,
+                limit=parse_limit(request.GET.get('limit')),
+                cursor=request.GET.get('cursor')
+            )
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        count, exact = pending_count(cluster_ids)
+        return JsonResponse({'count': count, 'count_exact': exact, **page})
+
+    except Exception as e:
+        print(f"Error in pending_approvals: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
@@ -1,8 +1,9 @@
-from django.db.models.functions import ExtractMonth, ExtractYear
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
-from django.db.models import Sum, Max
-from myapp.models import User, Marketingfee, Report, Cluster
+from django.db.models import Sum
+from myapp.models import User, Marketingfee, MonthlyUsage
+from myapp.refdata import list_clusters
+from myapp.periods import period_filter
 from datetime import datetime
 
 @csrf_exempt
@@ -18,38 +19,40 @@ def report_overview(request):
         
         if branch_id:
             # Ambil semua cluster dalam branch tersebut
-            clusters = Cluster.objects.filter(id_branch=branch_id)
+            clusters = list_clusters(branch_id)
+            cluster_ids = [cluster['id_cluster'] for cluster in clusters]
             
             cluster_data = []
             total_branch_usage = 0
             
+            # Total usage per cluster dari tabel ringkasan (satu query)
+            usage_by_cluster = {
+                row['id_user__id_cluster']: row['usage']
+                for row in MonthlyUsage.objects.filter(
+                    id_user__id_cluster__in=cluster_ids,
+                    year=current_year,
+                    month=current_month
+                ).values('id_user__id_cluster').annotate(usage=Sum('total_amount'))
+            }
+            
+            # Total marketing fee per cluster (satu query)
+            fee_by_cluster = {
+                row['id_user__id_cluster']: row['fee']
+                for row in Marketingfee.objects.filter(
+                    id_user__id_cluster__in=cluster_ids,
+                    **period_filter(current_year, current_month)
+                ).values('id_user__id_cluster').annotate(fee=Sum('total'))
+            }
+            
             for cluster in clusters:
-                # Ambil semua user dalam cluster ini
-                cluster_users = User.objects.filter(id_cluster=cluster.id_cluster)
-                
-                # Hitung total usage untuk cluster ini
-                cluster_usage = Report.objects.filter(
-                    id_user__in=cluster_users.values('id_user'),
-                    time__month=current_month,
-                    time__year=current_year
-                ).aggregate(
-                    total_used=Sum('amount_used')
-                )['total_used'] or 0
-                
-                # Hitung total marketing fee untuk cluster ini
-                cluster_marketing_fee = Marketingfee.objects.filter(
-                    id_user__in=cluster_users.values('id_user'),
-                    time__month=current_month,
-                    time__year=current_year
-                ).aggregate(
-                    total=Sum('total')
-                )['total'] or 0
+                cluster_usage = usage_by_cluster.get(cluster['id_cluster']) or 0
+                cluster_marketing_fee = fee_by_cluster.get(cluster['id_cluster']) or 0
                 
                 total_branch_usage += cluster_usage
                 
                 cluster_data.append({
-                    "id_cluster": cluster.id_cluster,
-                    "cluster_name": cluster.cluster,
+                    "id_cluster": cluster['id_cluster'],
+                    "cluster_name": cluster['cluster'],
                     "total_fee_used": cluster_usage,
                     "total_marketing_fee": cluster_marketing_fee,
                     "percentage_used": (cluster_usage / cluster_marketing_fee * 100) if cluster_marketing_fee > 0 else 0
@@ -68,47 +71,48 @@ def report_overview(request):
             
         else:
             # Jika tidak ada branch_id, kembalikan data region seperti sebelumnya
-            # Cari bulan & tahun terbaru dari tabel Report
-            latest_report = Report.objects.aggregate(latest_time=Max('time'))["latest_time"]
+            # Cari bulan & tahun terbaru dari tabel ringkasan
+            latest_period = MonthlyUsage.objects.filter(
+                report_count__gt=0
+            ).order_by('-year', '-month').values('year', 'month').first()
 
-            if not latest_report:
+            if not latest_period:
                 return JsonResponse({"error": "No report data available"}, status=400)
 
-            latest_month = latest_report.month
-            latest_year = latest_report.year
-
-            # Ambil semua user dengan id_role=6
-            users = User.objects.filter(id_role=6)
-
-            region_totals = {}
+            latest_month = latest_period['month']
+            latest_year = latest_period['year']
 
-            for user in users:
-                id_user = user.id_user
-                id_region = user.id_region.id_region if user.id_region else None
+            # Total fee yang digunakan per region untuk user dengan id_role=6
+            usage_by_region = MonthlyUsage.objects.filter(
+                id_user__id_role=6,
+                id_user__id_region__isnull=False,
+                year=latest_year,
+                month=latest_month
+            ).values('id_user__id_region').annotate(total=Sum('total_amount'))
 
-                # Ambil total marketing fee per user di bulan terbaru
-                total_marketing_fee = (
-                    Marketingfee.objects.filter(id_user=id_user)
-                    .annotate(month=ExtractMonth('time'), year=ExtractYear('time'))
-                    .filter(month=latest_month, year=latest_year)
-                    .aggregate(total=Sum('total'))['total'] or 0
-                )
+            # Total marketing fee per region di bulan terbaru
+            fee_by_region = Marketingfee.objects.filter(
+                id_user__id_role=6,
+                id_user__id_region__isnull=False,
+                **period_filter(latest_year, latest_month)
+            ).values('id_user__id_region').annotate(total=Sum('total'))
 
-                # Ambil total fee yang digunakan dari report di bulan terbaru
-                total_fee_sum = (
-                    Report.objects.filter(id_user=id_user)
-                    .annotate(month=ExtractMonth('time'), year=ExtractYear('time'))
-                    .filter(month=latest_month, year=latest_year)
-                    .aggregate(total_amount=Sum("amount_used"))["total_amount"] or 0
-                )
+            # Setiap region yang punya user cluster tetap muncul walau belum ada data
+            region_totals = {
+                id_region: {"total_fee_used": 0, "total_marketing_fee": 0}
+                for id_region in User.objects.filter(
+                    id_role=6,
+                    id_region__isnull=False
+                ).values_list('id_region', flat=True).distinct()
+            }
 
-                # Simpan data per region
-                if id_region:
-                    if id_region not in region_totals:
-                        region_totals[id_region] = {"total_fee_used": 0, "total_marketing_fee": 0}
+            for row in usage_by_region:
+                totals = region_totals.setdefault(row['id_user__id_region'], {"total_fee_used": 0, "total_marketing_fee": 0})
+                totals["total_fee_used"] += row['total'] or 0
 
-                    region_totals[id_region]["total_fee_used"] += total_fee_sum
-                    region_totals[id_region]["total_marketing_fee"] += total_marketing_fee
+            for row in fee_by_region:
+                totals = region_totals.setdefault(row['id_user__id_region'], {"total_fee_used": 0, "total_marketing_fee": 0})
+                totals["total_marketing_fee"] += row['total'] or 0
 
             # Hitung persentase total fee per region
             region_percentages = [
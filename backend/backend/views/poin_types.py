@@ -1,9 +1,10 @@
 from django.http import JsonResponse
-from myapp.models import Poin
+from myapp.refdata import poin_types
+from myapp.conditional import refdata_condition
 
+@refdata_condition('poin-types')
 def get_poin_types(request):
     try:
-        poin_types = Poin.objects.all().values('id_poin', 'type')
-        return JsonResponse(list(poin_types), safe=False)
+        return JsonResponse(poin_types(), safe=False)
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500) 
\ No newline at end of file
+        return JsonResponse({'error': str(e)}, status=500) 
@@ -1,26 +1,12 @@
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from myapp.models import Recommendation, User, Poin
-from datetime import datetime
+from django.utils import timezone
+from myapp.models import Recommendation, User
+from myapp.refdata import get_cluster_user
+from myapp.periods import parse_month, period_key
+from myapp.dashboard_cache import invalidate_users
 import json
 
-def getMonthNumber(month: str) -> int:
-    months = {
-        'Januari': 1,
-        'Februari': 2,
-        'Maret': 3,
-        'April': 4,
-        'Mei': 5,
-        'Juni': 6,
-        'Juli': 7,
-        'Agustus': 8,
-        'September': 9,
-        'Oktober': 10,
-        'November': 11,
-        'Desember': 12
-    }
-    return months.get(month, datetime.now().month)
-
 @csrf_exempt
 def create_recommendation(request):
     try:
@@ -30,23 +16,29 @@ def create_recommendation(request):
         
         data = json.loads(request.body)
         
-        # Get user instance from cluster_id
+        # Get cluster user from cluster_id
         try:
-            user = User.objects.get(id_cluster=data.get('cluster_id'), id_role=6)
+            user = get_cluster_user(data.get('cluster_id'))
         except User.DoesNotExist:
             return JsonResponse({'error': 'User not found'}, status=404)
 
-        # Get or create recommendation
-        recommendation, created = Recommendation.objects.update_or_create(
-            id_user=user,  # Gunakan instance User, bukan cluster_id
-            id_poin_id=data.get('poin_id'),
-            time__month=getMonthNumber(data.get('month')),
-            time__year=data.get('year'),
-            defaults={
-                'recommend': data.get('recommend'),
-                'time': datetime(int(data.get('year')), getMonthNumber(data.get('month')), 1)
-            }
-        )
+        month_number = parse_month(data.get('month'))
+        # Insert atau update rekomendasi bulan ini dalam satu statement (ON CONFLICT);
+        # aturannya sama dengan endpoint batch: time = waktu submit terakhir
+        recommendation = Recommendation.objects.bulk_create(
+            [Recommendation(
+                id_user_id=user.id_user,  # Gunakan id user cluster, bukan cluster_id
+                id_poin_id=data.get('poin_id'),
+                recommend=data.get('recommend'),
+                time=timezone.now(),
+                period=period_key(data.get('year'), month_number)
+            )],
+            update_conflicts=True,
+            unique_fields=['id_user', 'id_poin', 'period'],
+            update_fields=['recommend', 'time']
+        )[0]
+        # bulk_create tidak memicu signal post_save
+        invalidate_users([user.id_user])
 
         return JsonResponse({
             'success': True,
@@ -71,21 +63,21 @@ def get_recommendation(request, cluster_id, poin_id):
             }, status=400)
 
         # Convert month name to number
-        month_number = getMonthNumber(month)
+        month_number = parse_month(month)
 
         # Get user from cluster_id
-        user = User.objects.filter(id_cluster=cluster_id).first()
-        if not user:
+        try:
+            user = get_cluster_user(cluster_id)
+        except User.DoesNotExist:
             return JsonResponse({
                 'error': f'No user found for cluster {cluster_id}'
             }, status=404)
 
         # Get recommendation
         recommendation = Recommendation.objects.filter(
-            id_user=user,
+            id_user=user.id_user,
             id_poin=poin_id,
-            time__month=month_number,
-            time__year=year
+            period=period_key(year, month_number)
         ).first()
 
         return JsonResponse({
@@ -1,16 +1,63 @@
-import os
-import time
+import json
 from pathlib import Path
 from datetime import datetime
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.conf import settings
 from django.utils import timezone
-from myapp.models import Report
+from django.db import transaction
+from myapp.models import EvidenceUpload, Report
+from myapp.usage_summary import record_report_created, record_report_deleted
+from myapp.evidence_storage import StagedUpload, release_evidence
+from myapp.resumable_uploads import MAX_CHUNK_SIZE, UploadError, append_chunk, finish_upload, received_bytes, start_upload
+
+ALLOWED_TYPES = ['.jpg', '.jpeg', '.png', '.pdf']
+
+
+def _report_fields(data):
+    """Field report dari form, atau None jika field wajib tidak lengkap."""
+    fields = {
+        'id_user_id': data.get('id_user'),
+        'id_poin_id': data.get('id_poin'),
+        'description': data.get('description'),
+        'amount_used': data.get('amount_used'),
+        'status': data.get('status', 'false').lower() == 'true'
+    }
+    if not all([fields['id_user_id'], fields['id_poin_id'], fields['description'], fields['amount_used']]):
+        return None
+
+    # Konversi waktu jika disediakan, atau gunakan waktu sekarang
+    report_time = data.get('time')
+    try:
+        if report_time:
+            fields['time'] = datetime.strptime(report_time, "%Y-%m-%d %H:%M:%S%z")
+        else:
+            fields['time'] = timezone.now()
+    except ValueError:
+        fields['time'] = timezone.now()
+    return fields
+
+
+def _save_report(staged, fields):
+    """Buat Report untuk file yang sudah di-stage; harus di dalam transaksi."""
+    # File dengan isi sama cukup disimpan sekali
+    report = Report.objects.create(image_url=staged.commit(), **fields)
+    record_report_created(report)
+    return report
+
+
+def _report_response(report):
+    return JsonResponse({
+        'message': 'Evidence berhasil diupload',
+        'data': {
+            'id': report.id,
+            'description': report.description,
+            'amount_used': float(report.amount_used),
+            'image_url': report.image_url,
+            'time': report.time.isoformat(),
+            'status': report.status
+        }
+    })
 
-# Pastikan folder `upload` ada di dalam `MEDIA_ROOT`
-UPLOAD_DIR = Path(settings.MEDIA_ROOT) / "upload"
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 @csrf_exempt
 def create_report(request):
@@ -23,99 +70,150 @@ def create_report(request):
         if not image_file:
             return JsonResponse({'error': 'No image file provided'}, status=400)
 
-        # Validasi ukuran file (maksimum 1MB)
+        # Validasi ukuran file (maksimum 1MB); file lebih besar lewat upload bertahap
         if image_file.size > 1 * 1024 * 1024:
             return JsonResponse({'error': 'File too large'}, status=400)
             
         # Validasi tipe file
-        allowed_types = ['.jpg', '.jpeg', '.png', '.pdf']
         file_ext = Path(image_file.name).suffix.lower()
-        if file_ext not in allowed_types:
+        if file_ext not in ALLOWED_TYPES:
             return JsonResponse({'error': 'Invalid file type'}, status=400)
         
-        # Nama unik untuk file
-        timestamp = int(time.time() * 1000)
-        file_name = f"{timestamp}{file_ext}"
-        file_path = UPLOAD_DIR / file_name
-
-        # Simpan file ke folder `upload/`
-        with open(file_path, 'wb') as destination:
-            for chunk in image_file.chunks():
-                destination.write(chunk)
-
-        # URL gambar yang bisa diakses
-        file_url = f"{settings.MEDIA_URL}upload/{file_name}"
-
-        # Ambil data dari request
-        user_id = request.POST.get('id_user')
-        poin_id = request.POST.get('id_poin')
-        description = request.POST.get('description')
-        amount_used = request.POST.get('amount_used')
-        report_time = request.POST.get('time')
-        status = request.POST.get('status', 'false').lower() == 'true'
-
-        # Validasi data yang wajib ada
-        if not all([user_id, poin_id, description, amount_used]):
-            file_path.unlink()  # Hapus file jika data tidak lengkap
+        # Validasi data yang wajib ada, sebelum file ditulis ke disk
+        fields = _report_fields(request.POST)
+        if fields is None:
             return JsonResponse({'error': 'Missing required fields'}, status=400)
 
-        # Konversi waktu jika disediakan, atau gunakan waktu sekarang
-        try:
-            if report_time:
-                time_obj = datetime.strptime(report_time, "%Y-%m-%d %H:%M:%S%z")
-            else:
-                time_obj = timezone.now()
-        except ValueError:
-            time_obj = timezone.now()
+        # Simpan file ke folder tmp sambil dihitung hash-nya
+        upload = StagedUpload.from_uploaded_file(image_file, file_ext)
 
         # Simpan ke database
         try:
-            report = Report.objects.create(
-                id_user_id=user_id,
-                id_poin_id=poin_id,
-                description=description,
-                amount_used=amount_used,
-                image_url=file_url,
-                status=status,
-                time=time_obj
-            )
+            with transaction.atomic():
+                report = _save_report(upload, fields)
         except Exception as db_error:
-            file_path.unlink()  # Hapus file jika gagal menyimpan ke database
+            upload.discard()  # Hapus file jika gagal menyimpan ke database
             return JsonResponse({'error': str(db_error)}, status=500)
 
-        return JsonResponse({
-            'message': 'Evidence berhasil diupload',
-            'data': {
-                'id': report.id,
-                'description': report.description,
-                'amount_used': float(report.amount_used),
-                'image_url': report.image_url,
-                'time': report.time.isoformat(),
-                'status': report.status
-            }
-        })
+        return _report_response(report)
         
     except Exception as e:
         return JsonResponse({'error': f'An error occurred: {str(e)}'}, status=500)
 
+
+def _upload_error(e):
+    body = {'error': str(e)}
+    if e.offset is not None:
+        body['offset'] = e.offset
+    return JsonResponse(body, status=e.status)
+
+
+@csrf_exempt
+def start_report_upload(request):
+    """Mulai upload evidence bertahap. Body JSON: file_name, size, sha256 (hex)."""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        data = json.loads(request.body)
+        file_ext = Path(data.get('file_name', '')).suffix.lower()
+        if file_ext not in ALLOWED_TYPES:
+            return JsonResponse({'error': 'Invalid file type'}, status=400)
+
+        upload = start_upload(file_ext, int(data.get('size', 0)), str(data.get('sha256', '')).lower())
+        return JsonResponse({
+            'upload_id': str(upload.id),
+            'offset': 0,
+            'max_chunk_size': MAX_CHUNK_SIZE
+        }, status=201)
+
+    except UploadError as e:
+        return _upload_error(e)
+    except (json.JSONDecodeError, TypeError, ValueError):
+        return JsonResponse({'error': 'Invalid upload request'}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@csrf_exempt
+def report_upload(request, upload_id):
+    """GET: offset upload saat ini (untuk melanjutkan). PUT ?offset=N: kirim satu potongan file."""
+    if request.method not in ('GET', 'PUT'):
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        if request.method == 'GET':
+            upload = EvidenceUpload.objects.get(id=upload_id)
+            return JsonResponse({'upload_id': str(upload.id), 'offset': received_bytes(upload), 'size': upload.size})
+
+        offset = request.GET.get('offset', '')
+        length = request.META.get('CONTENT_LENGTH', '')
+        if not offset.isdigit() or not length.isdigit():
+            return JsonResponse({'error': 'offset and Content-Length are required'}, status=400)
+
+        # Body dibaca langsung dari stream request per potongan kecil, tidak lewat request.body
+        new_offset = append_chunk(upload_id, int(offset), request, int(length))
+        upload = EvidenceUpload.objects.get(id=upload_id)
+        return JsonResponse({'upload_id': str(upload_id), 'offset': new_offset, 'size': upload.size})
+
+    except EvidenceUpload.DoesNotExist:
+        return JsonResponse({'error': 'Upload not found'}, status=404)
+    except UploadError as e:
+        return _upload_error(e)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@csrf_exempt
+def finalize_report_upload(request, upload_id):
+    """Selesaikan upload bertahap dan buat Report-nya; field form sama dengan create_report."""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        fields = _report_fields(request.POST)
+        if fields is None:
+            return JsonResponse({'error': 'Missing required fields'}, status=400)
+
+        upload, staged = finish_upload(upload_id)
+        try:
+            with transaction.atomic():
+                # Menghapus sesi upload juga mengunci barisnya, jadi finalize yang
+                # dikirim dua kali hanya membuat satu report
+                deleted, _ = EvidenceUpload.objects.filter(id=upload.id).delete()
+                if not deleted:
+                    return JsonResponse({'error': 'Upload already finalized'}, status=409)
+                report = _save_report(staged, fields)
+        except Exception:
+            # File tmp tetap disimpan supaya finalize bisa diulang
+            staged.discard_link()
+            raise
+
+        return _report_response(report)
+
+    except EvidenceUpload.DoesNotExist:
+        return JsonResponse({'error': 'Upload not found'}, status=404)
+    except UploadError as e:
+        return _upload_error(e)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
 @csrf_exempt
 def delete_report(request, report_id):
     if request.method != 'DELETE':
         return JsonResponse({'error': 'Method not allowed'}, status=405)
     
     try:
-        # Cek apakah laporan ada di database
-        report = Report.objects.get(id=report_id)
-
-        # Hapus file yang terkait jika ada
-        if report.image_url:
-            file_path = Path(settings.MEDIA_ROOT) / Path(report.image_url.replace(settings.MEDIA_URL, ""))
-            file_path = file_path.resolve()
-            if file_path.exists():
-                file_path.unlink()
-
-        # Hapus entri dari database
-        report.delete()
+        # Kunci laporan selama dihapus, supaya DELETE bersamaan untuk laporan yang
+        # sama tidak melepas file evidence dan mengurangi ringkasan dua kali
+        with transaction.atomic():
+            report = Report.objects.select_for_update().get(id=report_id)
+
+            # File (dan thumbnail-nya) ikut dihapus setelah commit jika tidak
+            # dipakai report lain
+            release_evidence(report.image_url, report.thumbnails)
+            report.delete()
+            record_report_deleted(report)
         return JsonResponse({'message': 'Evidence berhasil dihapus'}, status=200)
         
     except Report.DoesNotExist:
@@ -0,0 +1,49 @@
+from datetime import datetime
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from myapp.models import User
+from myapp.refdata import get_cluster_user
+from myapp.periods import parse_month
+from myapp.report_pages import parse_limit, report_page
+
+
+def _report_page_response(request, id_user):
+    year = request.GET.get('year', '')
+    year_number = int(year) if year.isdigit() else datetime.now().year
+    month_number = parse_month(request.GET.get('month'))
+
+    try:
+        page = report_page(
+            id_user,
+            year_number,
+            month_number,
+            limit=parse_limit(request.GET.get('limit')),
+            cursor=request.GET.get('cursor')
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse(page)
+
+
+@csrf_exempt
+def user_reports(request, user_id):
+    """Daftar report bulanan satu user, dipaginasi dengan ?limit= dan ?cursor="""
+    try:
+        return _report_page_response(request, user_id)
+    except Exception as e:
+        print(f"Error in user_reports: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@csrf_exempt
+def cluster_reports(request, cluster_id):
+    """Sama dengan user_reports, untuk user biasa (id_role=6) milik cluster"""
+    try:
+        cluster_user = get_cluster_user(cluster_id)
+        return _report_page_response(request, cluster_user.id_user)
+    except User.DoesNotExist:
+        return JsonResponse({'error': 'Cluster user not found'}, status=404)
+    except Exception as e:
+        print(f"Error in cluster_reports: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
@@ -1,10 +1,12 @@
-from rest_framework.response import Response
 from django.conf import settings
-from django.http import FileResponse
-import os
+from django.http import JsonResponse
+from pathlib import Path
+from myapp.media import send_file
 
 def get_image(request):
-        image_path = os.path.join(settings.BASE_DIR, 'images', 'upload', 'image.png')
-        if os.path.exists(image_path):
-            return FileResponse(open(image_path, 'rb'), content_type='image/png')
-        return Response({'error': 'Image not found'}, status=404)
+        image_path = Path(settings.BASE_DIR) / 'images' / 'upload' / 'image.png'
+        # File ini bisa diganti, jadi cukup revalidasi lewat ETag
+        response = send_file(request, image_path, cache_control='no-cache')
+        if response is None:
+            return JsonResponse({'error': 'Image not found'}, status=404)
+        return response
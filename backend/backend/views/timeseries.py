@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from myapp.periods import month_range, parse_month, year_range
+from myapp.refdata import clusters_in_scope
+from myapp.timeseries import bucket_label, report_series
+
+
+def _series_period(request):
+    # Rentang tanggal (start/end, inklusif), satu bulan (year + month) atau satu tahun
+    start = request.GET.get('start')
+    end = request.GET.get('end')
+    if start and end:
+        start_date = datetime.strptime(start, '%Y-%m-%d')
+        end_date = datetime.strptime(end, '%Y-%m-%d') + timedelta(days=1)
+        return timezone.make_aware(start_date), timezone.make_aware(end_date), 'day'
+
+    year = request.GET.get('year', '')
+    year = int(year) if year.isdigit() else datetime.now().year
+    if request.GET.get('month'):
+        return (*month_range(year, parse_month(request.GET.get('month'))), 'day')
+    return (*year_range(year), 'month')
+
+
+@csrf_exempt
+def report_timeseries(request, scope, scope_id):
+    """Total pemakaian per hari/minggu/bulan untuk user/cluster/branch/region/area.
+
+    Query: ?granularity=day|week|month dan periode ?start=&end= (YYYY-MM-DD),
+    ?year=&month= atau ?year= saja. Default granularity day untuk satu bulan/rentang
+    tanggal, month untuk satu tahun.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        if not scope_id.isdigit():
+            return JsonResponse({'error': f'Invalid scope: {scope}/{scope_id}'}, status=400)
+
+        if scope == 'user':
+            selector = {'user_ids': [int(scope_id)]}
+        else:
+            cluster_ids = clusters_in_scope(scope, scope_id)
+            if cluster_ids is None:
+                return JsonResponse({'error': f'Invalid scope: {scope}/{scope_id}'}, status=400)
+            selector = {'cluster_ids': cluster_ids}
+
+        try:
+            start, end, default_granularity = _series_period(request)
+            granularity = request.GET.get('granularity', default_granularity)
+            series = report_series(start, end, granularity, poin_id=request.GET.get('id_poin'), **selector)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        return JsonResponse({
+            'granularity': granularity,
+            'series': [{
+                'bucket': bucket.date().isoformat(),
+                'label': bucket_label(bucket, granularity),
+                'total_amount': total,
+                'report_count': report_count
+            } for bucket, total, report_count in series]
+        })
+
+    except Exception as e:
+        print(f"Error in report_timeseries: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
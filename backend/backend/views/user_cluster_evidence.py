@@ -2,6 +2,7 @@ from django.http import JsonResponse
 from django.db.models import Sum, F
 from django.views.decorators.csrf import csrf_exempt
 from myapp.models import Report, Recommendation
+from myapp.periods import parse_month, period_filter
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from datetime import datetime
@@ -31,10 +32,7 @@ def user_cluster_evidence(request, id_user=None, id_poin=None):
         )
 
         if month and year:
-            report_query = report_query.filter(
-                time__month=month,
-                time__year=year
-            )
+            report_query = report_query.filter(**period_filter(year, month))
 
         print(f"Found {report_query.count()} reports")
 
@@ -48,7 +46,8 @@ def user_cluster_evidence(request, id_user=None, id_poin=None):
                 "description",
                 "amount_used",
                 "time",
-                "image_url"
+                "image_url",
+                "thumbnails"
             )
         )
 
@@ -110,8 +109,7 @@ def cluster_evidence_with_poin(request, id_user, id_poin):
         reports = Report.objects.filter(
             id_user=id_user,
             id_poin=id_poin,
-            time__month=month,
-            time__year=year
+            **period_filter(year, parse_month(month))
         )
 
         # Proses data seperti sebelumnya
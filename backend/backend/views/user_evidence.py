@@ -2,6 +2,8 @@ from django.http import JsonResponse
 from django.db.models import Sum, F
 from django.views.decorators.csrf import csrf_exempt
 from myapp.models import Report, Recommendation, User
+from myapp.refdata import get_cluster_user
+from myapp.periods import period_filter, period_key
 from datetime import datetime
 
 @csrf_exempt
@@ -25,7 +27,7 @@ def user_evidence(request, id_cluster, id_poin):
 
         # Get user dari cluster
         try:
-            user = User.objects.get(id_cluster=id_cluster, id_role=6)
+            user = get_cluster_user(id_cluster)
         except User.DoesNotExist:
             return JsonResponse({
                 "error": f"No user found for cluster {id_cluster}",
@@ -40,10 +42,7 @@ def user_evidence(request, id_cluster, id_poin):
 
         # Terapkan filter bulan dan tahun
         if month and year:
-            report_query = report_query.filter(
-                time__month=month,
-                time__year=year
-            )
+            report_query = report_query.filter(**period_filter(year, month))
 
         print(f"Querying reports for month={month}, year={year}")
         print(f"Found {report_query.count()} reports")
@@ -58,7 +57,8 @@ def user_evidence(request, id_cluster, id_poin):
                 "description",
                 "amount_used",
                 "time",
-                "image_url"
+                "image_url",
+                "thumbnails"
             )
         )
 
@@ -76,15 +76,14 @@ def user_evidence(request, id_cluster, id_poin):
             Recommendation.objects.filter(
                 id_user=user.id_user, 
                 id_poin_id=id_poin,
-                time__month=month,
-                time__year=year
+                period=period_key(year, month)
             )
             .annotate(type=F("id_poin_id__type"))  
             .values("type", "id_user_id", "recommend", "time")
         )
 
         # Debug prints
-        print(f"Raw recommendation query: {Recommendation.objects.filter(id_user=user.id_user, id_poin_id=id_poin, time__month=month, time__year=year).query}")
+        print(f"Raw recommendation query: {Recommendation.objects.filter(id_user=user.id_user, id_poin_id=id_poin, period=period_key(year, month)).query}")
         print(f"Found recommendations: {query_recommendation}")
 
         # Menghitung total_amount berdasarkan type dengan filter waktu yang sama
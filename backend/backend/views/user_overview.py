@@ -3,6 +3,9 @@ from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
 from django.db.models import Sum
 from myapp.models import User, Marketingfee, Report, Recommendation
+from myapp.periods import month_range, parse_month, period_filter
+from myapp.timeseries import chart_data, report_series
+from datetime import datetime
 
 @csrf_exempt
 def user_overview(request, id_user=None):
@@ -12,40 +15,14 @@ def user_overview(request, id_user=None):
     try:
         user = User.objects.get(id_user=id_user)
         
-        # Ambil semua report untuk bulan dan tahun yang dipilih
-        reports = Report.objects.filter(
-            id_user=id_user,
-            time__year=year,
-            time__month=getMonthNumber(month)
-        ).order_by('time')
-
-        # Debug
-        print(f"Found {reports.count()} reports for {month} {year}")
-        
-        # Hitung total per hari
-        daily_totals = {}
-        for report in reports:
-            date = report.time.strftime('%d %B %Y')
-            if date not in daily_totals:
-                daily_totals[date] = 0
-            daily_totals[date] += report.amount_used
-            # Debug
-            print(f"Date: {date}, Amount: {report.amount_used}")
-
-        # Format data untuk chart
-        monthly_data = {
-            'labels': list(daily_totals.keys()) if daily_totals else [f"{month} {year}"],
-            'datasets': [{
-                'label': 'Total Marketing Fee',
-                'data': list(daily_totals.values()) if daily_totals else [0],
-                'borderColor': '#FF4B2B',
-                'backgroundColor': 'rgba(255, 75, 43, 0.1)',
-                'tension': 0.4
-            }]
-        }
-
-        # Debug
-        print("Chart data:", monthly_data)
+        # Total per hari untuk chart, dihitung di database (semua hari dalam bulan)
+        month_number = parse_month(month, default=1)  # Default ke Januari jika bulan tidak ditemukan
+        year_number = int(year) if year and str(year).isdigit() else datetime.now().year
+        monthly_data = chart_data(
+            report_series(*month_range(year_number, month_number), 'day', user_ids=[id_user]),
+            'day',
+            'Total Marketing Fee'
+        )
 
         marketing = Marketingfee.objects.filter(id_user=id_user)
         report = Report.objects.filter(id_user=id_user)
@@ -53,7 +30,12 @@ def user_overview(request, id_user=None):
     except User.DoesNotExist:
         return JsonResponse({'error': 'User not found'}, status=404)
 
-    # Filter dan ekstrak bulan & tahun dari timestamp
+    # Filter berdasarkan bulan dan tahun jika diberikan
+    if month and year:
+        marketing = marketing.filter(**period_filter(year, parse_month(month)))
+        report = report.filter(**period_filter(year, parse_month(month)))
+
+    # Ekstrak bulan & tahun dari timestamp
     marketing_qs = marketing.annotate(
         month=ExtractMonth('time'),
         year=ExtractYear('time')
@@ -64,11 +46,6 @@ def user_overview(request, id_user=None):
         year=ExtractYear('time')
     )
 
-    # Filter berdasarkan bulan dan tahun jika diberikan
-    if month and year:
-        marketing_qs = marketing_qs.filter(month=int(month), year=int(year))
-        report_qs = report_qs.filter(month=int(month), year=int(year))
-
     # Konversi ke list JSON
     market_data = list(marketing_qs.values("total", "month", "year"))
 
@@ -117,20 +94,3 @@ def user_overview(request, id_user=None):
         "percentage_fee": total_percentage_fee,
         "monthlyData": monthly_data  # Tambahkan data untuk chart
     }, safe=False)
-
-def getMonthNumber(month: str) -> int:
-    months = {
-        'Januari': 1,
-        'Februari': 2,
-        'Maret': 3,
-        'April': 4,
-        'Mei': 5,
-        'Juni': 6,
-        'Juli': 7,
-        'Agustus': 8,
-        'September': 9,
-        'Oktober': 10,
-        'November': 11,
-        'Desember': 12
-    }
-    return months.get(month, 1)  # Default ke Januari jika bulan tidak ditemukan
@@ -3,14 +3,18 @@ from django.middleware.csrf import get_token
 from django.core.cache import cache
 from django.http import JsonResponse
 from dotenv import load_dotenv
-from twilio.rest import Client
+from django.db import IntegrityError
+from django.db.models import Q
 from myapp.models import User, Region, Branch, Cluster, Role, Area
+from myapp.user_ids import allocate_user_id
+from myapp.passwords import averify_password, hash_password
+from myapp.otp import enqueue_otp, check_otp
 import regex as re
 import json
 import os
-import bcrypt
 import jwt
 import datetime
+import uuid
 
 load_dotenv() 
 
@@ -21,32 +25,21 @@ def get_csrf_token(request):
 
 @csrf_exempt
 def send_otp(request, no_telp):
-    account_sid = os.getenv('account_sid')
-    auth_token = os.getenv('auth_token')
-    service_id = os.getenv('service_id')
-    client = Client(account_sid, auth_token)
+    # SMS dikirim oleh worker (manage.py otp_worker), request tidak menunggu provider
+    job = enqueue_otp(no_telp)
 
-    verification = client.verify.services(service_id).verifications.create( 
-        to=no_telp,
-        channel="sms")
-
-    return JsonResponse(f"OTP sent to {no_telp}. Status: {verification.status}", safe=False)
+    return JsonResponse(f"OTP queued for {no_telp}. Status: {job.status}", safe=False)
 
 @csrf_exempt
-def check_status(request, no_telp, code_otp):
-    account_sid = os.getenv('account_sid')
-    auth_token = os.getenv('auth_token')
-    service_id = os.getenv('service_id')
-    client = Client(account_sid, auth_token)
-
-    verification_check = client.verify.services(service_id).verification_checks.create(
-    to=no_telp,
-    code=code_otp)
+def check_status(request, no_telp, code_otp=None):
+    code_otp = code_otp or request.GET.get('code')
+    if not code_otp:
+        return JsonResponse({'error': 'Kode OTP harus diisi'}, status=400)
 
-    return verification_check.status
+    return JsonResponse({'status': check_otp(no_telp, code_otp)})
 
 @csrf_exempt
-def user_login(request):
+async def user_login(request):
     if request.method != 'POST':
         return JsonResponse({'error': 'Method not allowed'}, status=405)
     
@@ -63,38 +56,18 @@ def user_login(request):
 
         # Cari user
         try:
-            user = User.objects.get(username=username)
+            user = await User.objects.aget(username=username)
         except User.DoesNotExist:
             return JsonResponse({
                 'error': 'Username atau password salah'
             }, status=401)
 
-        # Cek apakah password dalam format bcrypt
-        is_bcrypt = user.password.startswith('$2b$') or user.password.startswith('$2a$')
+        # Verifikasi password di thread pool bcrypt (tidak menahan event loop)
+        password_valid, new_hash = await averify_password(password, user.password)
 
-        # Verifikasi password
-        password_valid = False
-        if is_bcrypt:
-            # Password sudah dalam format bcrypt
-            try:
-                password_valid = bcrypt.checkpw(
-                    password.encode('utf-8'), 
-                    user.password.encode('utf-8')
-                )
-            except Exception as e:
-                print(f"Bcrypt error: {str(e)}")
-                password_valid = False
-        else:
-            # Password lama (plain text), verifikasi langsung
-            password_valid = (user.password == password)
-            if password_valid:
-                # Update ke bcrypt hash
-                hashed_password = bcrypt.hashpw(
-                    password.encode('utf-8'), 
-                    bcrypt.gensalt()
-                ).decode('utf-8')
-                user.password = hashed_password
-                user.save()
+        if new_hash:
+            # Password plain text lama atau cost bcrypt berubah: simpan hash baru
+            await User.objects.filter(id_user=user.id_user).aupdate(password=new_hash)
 
         if not password_valid:
             return JsonResponse({
@@ -121,6 +94,7 @@ def user_login(request):
 
         # Generate token dengan role
         token = jwt.encode({
+            'jti': uuid.uuid4().hex,  # key cache principal di jwt_authentication_middleware
             'user_id': user.id_user,
             'username': user.username,
             'role': user_role,
@@ -133,10 +107,10 @@ def user_login(request):
             'username': user.username,
             'email': user.email,
             'role': user_role,
-            'cluster': user.id_cluster.id_cluster if user.id_cluster else None,
-            'branch': user.id_branch.id_branch if user.id_branch else None,
-            'region': user.id_region.id_region if user.id_region else None,
-            'area': user.id_area.id_area if user.id_area else None,
+            'cluster': user.id_cluster_id,
+            'branch': user.id_branch_id,
+            'region': user.id_region_id,
+            'area': user.id_area_id,
             'permissions': {
                 'can_view_area': user_role in ['admin_area'],
                 'can_view_region': user_role in ['admin_area', 'admin_region'],
@@ -206,42 +180,37 @@ def user_register(request):
                 }, status=400)
 
             try:
-                # Cek apakah username sudah ada
-                if User.objects.filter(username=username).exists():
+                # Cek username, email dan user cluster yang sudah ada dalam satu query
+                conflicts = list(User.objects.filter(
+                    Q(username=username) |
+                    Q(email=email) |
+                    Q(id_cluster_id=cluster_id, id_role_id=6)
+                ).values_list('username', 'email', 'id_cluster_id', 'id_role_id'))
+
+                if any(row[0] == username for row in conflicts):
                     return JsonResponse({
                         "error": "Username sudah digunakan.",
                         "status": "Failed"
                     }, status=400)
 
-                # Cek apakah email sudah ada
-                if User.objects.filter(email=email).exists():
+                if any(row[1] == email for row in conflicts):
                     return JsonResponse({
                         "error": "Email sudah digunakan.",
                         "status": "Failed"
                     }, status=400)
 
                 # Cek apakah cluster sudah memiliki user (bukan admin)
-                existing_user = User.objects.filter(
-                    id_cluster_id=cluster_id,
-                    id_role_id=6
-                ).exists()
-
-                if existing_user:
+                if conflicts:
                     return JsonResponse({
                         "error": "Cluster ini sudah memiliki user.",
                         "status": "Failed"
                     }, status=400)
 
-                # Generate user ID
-                user_id_key = 6001
-                while User.objects.filter(id_user=user_id_key).exists():
-                    user_id_key += 1
+                # Generate user ID dari sequence role user cluster
+                user_id_key = allocate_user_id(role_id)
 
                 # Hash password sebelum disimpan
-                hashed_password = bcrypt.hashpw(
-                    password_input.encode('utf-8'), 
-                    bcrypt.gensalt()
-                ).decode('utf-8')
+                hashed_password = hash_password(password_input)
 
                 # Create new user
                 user = User.objects.create(
@@ -265,6 +234,14 @@ def user_register(request):
                     "username": username
                 }, status=201)
 
+            except IntegrityError as e:
+                # Registrasi bersamaan dengan username/email yang sama
+                print(f"Error creating user: {str(e)}")  # Debug log
+                return JsonResponse({
+                    "error": "Username atau email sudah digunakan.",
+                    "status": "Failed"
+                }, status=400)
+
             except Exception as e:
                 print(f"Error creating user: {str(e)}")  # Debug log
                 return JsonResponse({
@@ -286,12 +263,10 @@ def user_verify(request):
         data = json.loads(request.body)
         code_otp = data.get("code_otp")
         cache_user_data = cache.get('+xxxxxxxxxxxxxx')
-        verif = check_status(request,cache_user_data.get('no_telp'),code_otp)
+        verif = check_otp(cache_user_data.get('no_telp'), code_otp)
         
         if verif == 'approved':
-            user_id_key = 6001
-            while User.objects.filter(id_user=user_id_key).exists():
-                user_id_key += 1
+            user_id_key = allocate_user_id(6)
 
             user = User.objects.create(
                 id_user = user_id_key,
@@ -0,0 +1,46 @@
+from django.db import connection
+from myapp.dashboard_cache import invalidate_users
+from myapp.usage_summary import record_reports_approved
+
+# Approve banyak report dengan satu UPDATE ... RETURNING: baris yang dikunci UPDATE
+# dicek ulang status-nya oleh Postgres, jadi approve bersamaan tidak menghitung
+# report yang sama dua kali, dan RETURNING sudah cukup untuk ringkasan bulanan,
+# invalidasi cache dan jumlah per cluster tanpa query tambahan.
+APPROVE_SQL = '''
+    UPDATE "Report" SET status = true, approved_at = %s
+    WHERE status = false AND {condition}
+    RETURNING id, id_user, id_poin, time,
+        (SELECT id_cluster FROM "User" WHERE "User".id_user = "Report".id_user)
+'''
+
+
+def approve_reports(approved_at, report_ids=None, cluster_ids=None, user_ids=None, start=None, end=None):
+    """Approve report pending, hasilnya {id_cluster: jumlah report yang di-approve}.
+
+    Pilih report lewat `report_ids`, atau lewat `cluster_ids`/`user_ids` ditambah
+    periode [start, end). Harus dipanggil di dalam transaksi.
+    """
+    if report_ids is not None:
+        condition = 'id = ANY(%s)'
+        params = [list(report_ids)]
+    else:
+        if cluster_ids is not None:
+            condition = 'id_user IN (SELECT id_user FROM "User" WHERE id_cluster = ANY(%s))'
+            params = [list(cluster_ids)]
+        else:
+            condition = 'id_user = ANY(%s)'
+            params = [[int(id_user) for id_user in user_ids]]
+        condition += ' AND time >= %s AND time < %s'
+        params += [start, end]
+
+    with connection.cursor() as cursor:
+        cursor.execute(APPROVE_SQL.format(condition=condition), [approved_at, *params])
+        rows = cursor.fetchall()
+
+    record_reports_approved([(id_user, id_poin, time) for _, id_user, id_poin, time, _ in rows])
+    invalidate_users({row[1] for row in rows})
+
+    counts = {}
+    for *_, id_cluster in rows:
+        counts[id_cluster] = counts.get(id_cluster, 0) + 1
+    return counts
@@ -0,0 +1,64 @@
+from datetime import datetime
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from myapp import refdata
+from myapp.dashboard_cache import scope_version
+from myapp.periods import parse_month
+from myapp.versions import version_datetime
+
+# Conditional GET (ETag / Last-Modified) untuk endpoint yang sering di-polling.
+# ETag dihitung hanya dari versi data di cache, jadi If-None-Match yang cocok
+# langsung dijawab 304 tanpa query aggregasi sama sekali. no-cache memaksa browser
+# selalu revalidasi alih-alih memakai heuristik Last-Modified.
+
+
+def _conditional(etag_func, last_modified_func):
+    def decorator(view):
+        return cache_control(no_cache=True)(condition(etag_func, last_modified_func)(view))
+    return decorator
+
+
+def refdata_condition(endpoint):
+    """Untuk endpoint lookup (poin, lokasi) yang isinya hanya data referensi."""
+    def etag(request, *args, **kwargs):
+        parts = (endpoint, *args, *kwargs.values(), refdata.current_version())
+        return '"{}"'.format('-'.join(str(part) for part in parts))
+
+    def last_modified(request, *args, **kwargs):
+        return version_datetime(refdata.current_version())
+
+    return _conditional(etag, last_modified)
+
+
+def _dashboard_period(request):
+    year = request.GET.get('year', '')
+    year = int(year) if year.isdigit() else datetime.now().year
+    return year, parse_month(request.GET.get('month'))
+
+
+def dashboard_condition(endpoint, scope, scope_kwarg=None, scope_id=None):
+    """Untuk dashboard yang di-cache lewat dashboard_cache.
+
+    Id scope diambil dari URL kwarg `scope_kwarg`, atau `scope_id` jika tetap.
+    ETag juga memuat versi refdata karena nama dan hirarki ikut di respons.
+    """
+    def _versions(kwargs):
+        value = kwargs.get(scope_kwarg) if scope_kwarg else scope_id
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            return None, None
+        return value, (scope_version(scope, value), refdata.current_version())
+
+    def etag(request, *args, **kwargs):
+        value, versions = _versions(kwargs)
+        if versions is None:
+            return None
+        year, month = _dashboard_period(request)
+        return f'"{endpoint}-{value}-{year}-{month}-{versions[0]}-{versions[1]}"'
+
+    def last_modified(request, *args, **kwargs):
+        _, versions = _versions(kwargs)
+        return version_datetime(max(versions)) if versions else None
+
+    return _conditional(etag, last_modified)
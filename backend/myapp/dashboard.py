@@ -0,0 +1,79 @@
+from django.db.models import Sum
+from myapp.models import Marketingfee, MonthlyUsage, Recommendation
+from myapp.refdata import poin_types
+from myapp.periods import period_filter, period_key, year_range
+from myapp.report_pages import report_page
+from myapp.timeseries import chart_data, report_series
+
+
+def build_cluster_dashboard(user, year, month, chart_label='Marketing Fee'):
+    """Data dashboard satu user cluster untuk bulan tertentu.
+
+    Dipakai bersama oleh user_dashboard dan dashboard cluster admin (cluster, branch,
+    region). `user` cukup punya atribut id_user, username dan telp. Jumlah query tetap
+    lima berapapun jumlah tipe poin: total per poin bulan ini, seri bulanan setahun,
+    rekomendasi, marketing fee dan halaman pertama report bulan ini.
+    """
+    # 1. Total per poin bulan ini dari ringkasan bulanan
+    poin_totals = {}
+    total_reports = 0
+    for id_poin, amount, report_count in MonthlyUsage.objects.filter(
+        id_user=user.id_user,
+        year=year,
+        month=month
+    ).values_list('id_poin', 'total_amount', 'report_count'):
+        poin_totals[id_poin] = amount
+        total_reports += report_count
+
+    # 2. Seri bulanan setahun untuk chart, 12 bucket termasuk bulan tanpa report
+    monthly_data = chart_data(
+        report_series(*year_range(year), 'month', user_ids=[user.id_user]),
+        'month',
+        chart_label
+    )
+
+    # 3. Rekomendasi semua poin bulan ini
+    recommendations = dict(Recommendation.objects.filter(
+        id_user=user.id_user,
+        period=period_key(year, month)
+    ).values_list('id_poin', 'recommend'))
+
+    usage_details = []
+    for poin in poin_types():
+        poin_amount = poin_totals.get(poin['id_poin'], 0)
+        recommend_value = recommendations.get(poin['id_poin']) or 0
+        percentage = (poin_amount / recommend_value * 100) if recommend_value > 0 else 0
+
+        usage_details.append({
+            'id_poin': poin['id_poin'],
+            'type': poin['type'],
+            'total_amount': poin_amount,
+            'percentage': round(percentage, 2),
+            'recommendation': recommend_value
+        })
+
+    # 4. Marketing fee bulan ini
+    marketing_fee = Marketingfee.objects.filter(
+        id_user=user.id_user,
+        **period_filter(year, month)
+    ).aggregate(total=Sum('total'))['total'] or 0
+
+    # 5. Halaman pertama report bulan ini, sisanya lewat endpoint report_list
+    first_page = report_page(user.id_user, year, month)
+
+    return {
+        'overview': {
+            'total_reports': total_reports,
+            'total_amount': sum(poin_totals.values()),
+            'user_data': {
+                'id_user': user.id_user,
+                'username': user.username,
+                'telp': user.telp or ''
+            }
+        },
+        'monthlyData': monthly_data,
+        'usage_details': usage_details,
+        'reports': first_page['reports'],
+        'reports_next_cursor': first_page['next_cursor'],
+        'marketing_fee': marketing_fee
+    }
@@ -0,0 +1,82 @@
+from django.core.cache import cache
+from django.db import transaction
+from myapp.models import User
+from myapp.refdata import current_version, get_refdata
+from myapp.versions import get_version, bump_version
+
+# Respons dashboard di-cache per (endpoint, scope, id, tahun, bulan). Tiap scope
+# (area, region, branch, cluster, user) punya versi data (myapp.versions) dan key
+# respons memuat versi itu. Invalidasi cukup menaikkan versi scope yang terdampak,
+# jadi tidak butuh delete_pattern dan tetap jalan di backend locmem/file. Entry
+# lama tidak pernah dibaca lagi dan hilang sendiri setelah TIMEOUT. Versi yang
+# sama dipakai untuk ETag/Last-Modified (myapp.conditional).
+TIMEOUT = 300  # detik, juga batas umur data jika cache tidak dibagi antar proses
+
+
+def _version_key(scope, scope_id):
+    return f'dashboard:version:{scope}:{scope_id}'
+
+
+def scope_version(scope, scope_id):
+    return get_version(_version_key(scope, scope_id))
+
+
+def get_or_build(endpoint, scope, scope_id, year, month, build):
+    """Ambil respons dashboard dari cache, atau panggil build() lalu simpan hasilnya.
+
+    Exception dari build() (mis. DoesNotExist) diteruskan dan tidak di-cache.
+    """
+    key = 'dashboard:{}:{}:{}:{}:{}:{}:{}'.format(
+        endpoint, scope, scope_id, scope_version(scope, scope_id), current_version(), year, month
+    )
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, TIMEOUT)
+    return data
+
+
+def bump(scope, scope_id):
+    bump_version(_version_key(scope, scope_id))
+
+
+def scopes_for_users(user_ids):
+    """Scope dashboard yang memuat data user: user itu sendiri, cluster dan semua atasannya."""
+    hierarchy = get_refdata()
+    scopes = set()
+    for id_user, id_cluster, id_branch, id_region in User.objects.filter(
+        id_user__in=user_ids
+    ).values_list('id_user', 'id_cluster', 'id_branch', 'id_region'):
+        scopes.add(('user', id_user))
+
+        if id_cluster is not None:
+            scopes.add(('cluster', id_cluster))
+            cluster = hierarchy.clusters.get(id_cluster)
+            if cluster is not None:
+                id_branch = cluster['id_branch']
+
+        if id_branch is not None:
+            scopes.add(('branch', id_branch))
+            branch = hierarchy.branches.get(id_branch)
+            if branch is not None:
+                id_region = branch['id_region']
+
+        if id_region is not None:
+            scopes.add(('region', id_region))
+            region = hierarchy.regions.get(id_region)
+            if region is not None:
+                scopes.add(('area', region['id_area']))
+    return scopes
+
+
+def invalidate_users(user_ids):
+    """Buang cache dashboard yang memuat data user-user ini setelah transaksi commit."""
+    user_ids = {int(id_user) for id_user in user_ids if id_user}
+    if not user_ids:
+        return
+
+    def _bump_scopes():
+        for scope, scope_id in scopes_for_users(user_ids):
+            bump(scope, scope_id)
+
+    transaction.on_commit(_bump_scopes)
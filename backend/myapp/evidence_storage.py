@@ -0,0 +1,163 @@
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from django.conf import settings
+from django.db import connection, transaction
+from myapp.thumbnails import delete_thumbnails, media_path
+
+# File evidence disimpan berdasarkan hash isinya (sha256) di folder bertingkat
+# evidence/ab/cd/<hash>.<ext>, jadi tidak ada satu folder berisi ratusan ribu file
+# dan upload bersamaan tidak bisa bentrok nama. File yang sama di-upload ulang
+# hanya disimpan sekali; tabel EvidenceBlob mencatat berapa report yang memakainya.
+EVIDENCE_DIR = Path(settings.MEDIA_ROOT) / "evidence"
+TMP_DIR = Path(settings.MEDIA_ROOT) / "tmp"  # di luar folder yang bisa diakses lewat api/media
+
+ACQUIRE_SQL = '''
+    INSERT INTO "EvidenceBlob" (sha256, path, size, ref_count, created_at)
+    VALUES (%s, %s, %s, 1, now())
+    ON CONFLICT (sha256) DO UPDATE SET ref_count = "EvidenceBlob".ref_count + 1
+    RETURNING path
+'''
+
+RELEASE_SQL = '''
+    UPDATE "EvidenceBlob" SET ref_count = ref_count - 1
+    WHERE path = %s
+    RETURNING sha256, ref_count
+'''
+
+
+def _relative_path(digest, extension):
+    return f"{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+
+def _url(relative_path):
+    return f"{settings.MEDIA_URL}evidence/{relative_path}"
+
+
+def _lock_blob(cursor, relative_path):
+    # Memindah dan menghapus file blob yang sama tidak boleh berjalan bersamaan
+    cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [relative_path])
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class StagedUpload:
+    """File upload yang sudah ada di folder tmp dan di-hash, belum dipakai report."""
+
+    def __init__(self, tmp_path, extension, sha256, size):
+        self.tmp_path = tmp_path
+        self.extension = extension
+        self.sha256 = sha256
+        self.size = size
+        self.relative_path = None  # diisi commit()
+
+    @classmethod
+    def from_uploaded_file(cls, uploaded_file, extension):
+        """Tulis file upload Django ke folder tmp sambil dihitung hash-nya."""
+        TMP_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = TMP_DIR / uuid.uuid4().hex
+
+        digest = hashlib.sha256()
+        size = 0
+        with open(tmp_path, 'wb') as destination:
+            for chunk in uploaded_file.chunks():
+                digest.update(chunk)
+                size += len(chunk)
+                destination.write(chunk)
+        return cls(tmp_path, extension, digest.hexdigest(), size)
+
+    @classmethod
+    def from_path(cls, tmp_path, extension):
+        """File yang sudah lengkap di folder tmp (upload bertahap)."""
+        return cls(tmp_path, extension, hash_file(tmp_path), tmp_path.stat().st_size)
+
+    def commit(self):
+        """Tambah referensi ke blob ini, hasilnya URL file. Harus di dalam transaksi.
+
+        File di-hard link ke lokasi akhirnya sebelum commit, selama advisory lock
+        blob ditahan transaksi ini, jadi setelah commit file pasti ada dan
+        release_evidence tidak bisa menghapusnya di tengah jalan. Jika transaksi
+        gagal, file tmp masih utuh (upload bertahap bisa di-finalize ulang) dan
+        discard() membersihkan hasil link-nya.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(ACQUIRE_SQL, [self.sha256, _relative_path(self.sha256, self.extension), self.size])
+            self.relative_path = cursor.fetchone()[0]
+            _lock_blob(cursor, self.relative_path)
+
+        final_path = EVIDENCE_DIR / self.relative_path
+        final_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(self.tmp_path, final_path)
+        except FileExistsError:
+            # Isi file sama persis (nama file = hash isinya)
+            pass
+
+        transaction.on_commit(self.discard_tmp, robust=True)
+        return _url(self.relative_path)
+
+    def discard_tmp(self):
+        if self.tmp_path.exists():
+            self.tmp_path.unlink()
+
+    def discard_link(self):
+        """Buang hasil link commit() yang transaksinya gagal; dipanggil di luar transaksi itu."""
+        if self.relative_path:
+            _delete_if_unused(self.relative_path)
+
+    def discard(self):
+        """Buang upload yang gagal disimpan; dipanggil di luar transaksinya."""
+        self.discard_tmp()
+        self.discard_link()
+
+
+def _delete_if_unused(relative_path, thumbnails=None):
+    with transaction.atomic(), connection.cursor() as cursor:
+        _lock_blob(cursor, relative_path)
+        # Upload baru dengan isi sama bisa saja sudah membuat blob-nya lagi
+        cursor.execute('SELECT 1 FROM "EvidenceBlob" WHERE path = %s', [relative_path])
+        if cursor.fetchone():
+            return
+        file_path = EVIDENCE_DIR / relative_path
+        if file_path.exists():
+            file_path.unlink()
+        delete_thumbnails(thumbnails)
+
+
+def release_evidence(image_url, thumbnails=None):
+    """Lepas referensi report ke file evidence-nya. Harus di dalam transaksi.
+
+    File (dan thumbnail-nya) baru dihapus setelah commit, dan hanya jika tidak ada
+    report lain yang memakai file yang sama. File lama di folder upload/ (sebelum
+    storage ini ada) langsung dihapus seperti dulu.
+    """
+    if not image_url:
+        return
+
+    prefix = _url('')
+    if not image_url.startswith(prefix):
+        def _delete_legacy():
+            file_path = media_path(image_url)
+            if file_path.exists():
+                file_path.unlink()
+            delete_thumbnails(thumbnails)
+
+        transaction.on_commit(_delete_legacy, robust=True)
+        return
+
+    relative_path = image_url[len(prefix):]
+    with connection.cursor() as cursor:
+        cursor.execute(RELEASE_SQL, [relative_path])
+        row = cursor.fetchone()
+        if row is None or row[1] > 0:
+            return
+        cursor.execute('DELETE FROM "EvidenceBlob" WHERE sha256 = %s AND ref_count <= 0', [row[0]])
+
+    transaction.on_commit(lambda: _delete_if_unused(relative_path, thumbnails), robust=True)
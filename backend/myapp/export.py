@@ -0,0 +1,62 @@
+from myapp.models import Report
+from myapp.refdata import get_refdata, poin_types
+
+BATCH_SIZE = 2000
+
+CSV_HEADER = [
+    'id', 'time', 'username', 'region', 'branch', 'cluster', 'poin',
+    'description', 'amount_used', 'status', 'approved_at', 'image_url'
+]
+
+
+def iter_report_batches(cluster_ids, start, end, batch_size=BATCH_SIZE):
+    """Report di cluster-cluster ini dalam rentang [start, end), per batch.
+
+    Memakai keyset (id > id terakhir) alih-alih queryset.iterator(): lewat pgbouncer
+    mode transaction server-side cursor tidak bisa dipakai, dan tanpa itu psycopg2
+    memuat seluruh hasil query ke memori. Dengan batch, memori tetap datar
+    berapapun jumlah barisnya.
+    """
+    reports = Report.objects.filter(
+        id_user__id_cluster__in=cluster_ids,
+        time__gte=start,
+        time__lt=end
+    ).order_by('id').values_list(
+        'id', 'time', 'id_user__username', 'id_user__id_cluster', 'id_poin',
+        'description', 'amount_used', 'status', 'approved_at', 'image_url'
+    )
+
+    last_id = 0
+    while True:
+        batch = list(reports.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1][0]
+
+
+def iter_report_rows(cluster_ids, start, end):
+    """Baris CSV (sesuai CSV_HEADER) dengan nama cluster/branch/region/poin."""
+    hierarchy = get_refdata()
+    poin_names = {poin['id_poin']: poin['type'] for poin in poin_types()}
+
+    for batch in iter_report_batches(cluster_ids, start, end):
+        for (id_report, time, username, id_cluster, id_poin,
+             description, amount_used, status, approved_at, image_url) in batch:
+            cluster = hierarchy.clusters.get(id_cluster, {})
+            branch = hierarchy.branches.get(cluster.get('id_branch'), {})
+            region = hierarchy.regions.get(branch.get('id_region'), {})
+            yield [
+                id_report,
+                time.isoformat() if time else '',
+                username,
+                region.get('name', ''),
+                branch.get('name', ''),
+                cluster.get('name', ''),
+                poin_names.get(id_poin, ''),
+                description or '',
+                amount_used,
+                'approved' if status else 'pending',
+                approved_at.isoformat() if approved_at else '',
+                image_url or ''
+            ]
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from myapp.dashboard_cache import invalidate_users
+
+# Baris MarketingFee lain milik user yang sama di bulan yang sama dengan id lebih
+# besar (submit lebih baru). Bulan dihitung dari time supaya command ini juga bisa
+# dijalankan sebelum kolom period ada (sebelum migrate 0007).
+DUPLICATES_SQL = '''
+    FROM "MarketingFee" m
+    WHERE EXISTS (
+        SELECT 1 FROM "MarketingFee" newer
+        WHERE newer.id_user = m.id_user
+          AND date_trunc('month', newer.time AT TIME ZONE 'UTC') = date_trunc('month', m.time AT TIME ZONE 'UTC')
+          AND newer.id > m.id
+    )
+'''
+
+
+class Command(BaseCommand):
+    help = 'Hapus marketing fee dobel per user per bulan, yang dipertahankan baris terbaru'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Hanya tampilkan baris yang akan dihapus')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                if options['dry_run']:
+                    cursor.execute('SELECT m.id, m.id_user, m.time, m.total ' + DUPLICATES_SQL + ' ORDER BY m.id_user, m.id')
+                else:
+                    cursor.execute('DELETE ' + DUPLICATES_SQL + ' RETURNING m.id, m.id_user, m.time, m.total')
+                rows = cursor.fetchall()
+
+            for id_fee, id_user, time, total in rows:
+                self.stdout.write(f'{id_fee}\tuser={id_user}\ttime={time:%Y-%m-%d}\ttotal={total}')
+
+            if options['dry_run']:
+                self.stdout.write(f'{len(rows)} duplicate row(s) would be deleted')
+                return
+
+            invalidate_users({id_user for _, id_user, _, _ in rows})
+
+        self.stdout.write(self.style.SUCCESS(f'{len(rows)} duplicate row(s) deleted'))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from myapp.dashboard_cache import invalidate_users
+
+# Baris Recommendation lain milik user dan poin yang sama di bulan yang sama dengan
+# id lebih besar (rekomendasi lebih baru). Bulan dihitung dari time supaya command
+# ini juga bisa dijalankan sebelum kolom period ada (sebelum migrate 0008).
+DUPLICATES_SQL = '''
+    FROM "Recommendation" r
+    WHERE EXISTS (
+        SELECT 1 FROM "Recommendation" newer
+        WHERE newer.id_user = r.id_user
+          AND newer.id_poin = r.id_poin
+          AND date_trunc('month', newer.time AT TIME ZONE 'UTC') = date_trunc('month', r.time AT TIME ZONE 'UTC')
+          AND newer.id > r.id
+    )
+'''
+
+
+class Command(BaseCommand):
+    help = 'Hapus rekomendasi dobel per user per poin per bulan, yang dipertahankan baris terbaru'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Hanya tampilkan baris yang akan dihapus')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                if options['dry_run']:
+                    cursor.execute('SELECT r.id, r.id_user, r.id_poin, r.time, r.recommend ' + DUPLICATES_SQL + ' ORDER BY r.id_user, r.id_poin, r.id')
+                else:
+                    cursor.execute('DELETE ' + DUPLICATES_SQL + ' RETURNING r.id, r.id_user, r.id_poin, r.time, r.recommend')
+                rows = cursor.fetchall()
+
+            for id_recommendation, id_user, id_poin, time, recommend in rows:
+                self.stdout.write(f'{id_recommendation}\tuser={id_user}\tpoin={id_poin}\ttime={time:%Y-%m-%d}\trecommend={recommend}')
+
+            if options['dry_run']:
+                self.stdout.write(f'{len(rows)} duplicate row(s) would be deleted')
+                return
+
+            invalidate_users({row[1] for row in rows})
+
+        self.stdout.write(self.style.SUCCESS(f'{len(rows)} duplicate row(s) deleted'))
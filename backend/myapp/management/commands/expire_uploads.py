@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from myapp.resumable_uploads import expire_uploads
+
+
+class Command(BaseCommand):
+    help = 'Hapus upload evidence bertahap yang tidak diselesaikan dalam 24 jam'
+
+    def handle(self, *args, **options):
+        count = expire_uploads()
+        self.stdout.write(f'{count} upload(s) expired')
@@ -0,0 +1,25 @@
+import time
+from django.core.management.base import BaseCommand
+from myapp.otp import claim_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Jalankan antrian pengiriman OTP (tabel OtpJob)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sleep', type=float, default=1.0, help='Jeda (detik) saat antrian kosong')
+        parser.add_argument('--once', action='store_true', help='Proses job yang ada lalu berhenti')
+
+    def handle(self, *args, **options):
+        while True:
+            # Satu job per claim: job yang belum dikirim tidak ikut tertahan di worker
+            # ini (dan dianggap macet) selama provider lambat
+            jobs = claim_jobs(1)
+            for id_job, no_telp, attempts, locked_at in jobs:
+                status = run_job(id_job, no_telp, attempts, locked_at)
+                self.stdout.write(f'OtpJob {id_job} ({no_telp}): {status}')
+
+            if not jobs:
+                if options['once']:
+                    return
+                time.sleep(options['sleep'])
@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from myapp.thumbnails import process_pending
+
+
+class Command(BaseCommand):
+    help = 'Buat thumbnail untuk evidence report yang belum diproses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=20, help='Jumlah report yang diproses sekali jalan')
+        parser.add_argument('--sleep', type=float, default=5.0, help='Jeda (detik) saat tidak ada report baru')
+        parser.add_argument('--once', action='store_true', help='Proses report yang ada lalu berhenti')
+
+    def handle(self, *args, **options):
+        while True:
+            count = process_pending(options['batch'])
+            if count:
+                self.stdout.write(f'{count} report(s) processed')
+                continue
+
+            if options['once']:
+                return
+            time.sleep(options['sleep'])
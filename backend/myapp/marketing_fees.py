@@ -0,0 +1,47 @@
+from django.db import connection
+from myapp.dashboard_cache import invalidate_users
+from myapp.periods import month_range, period_key
+
+# Simpan marketing fee satu bulan untuk banyak user dalam satu statement. Unique
+# key (id_user, period) membuat submit bersamaan tidak bisa membuat baris dobel.
+# xmax = 0 hanya untuk baris yang baru di-insert, jadi bisa membedakan created/updated.
+UPSERT_MONTH_SQL = '''
+    INSERT INTO "MarketingFee" (id_user, id_cluster, total, time, period)
+    VALUES {values}
+    ON CONFLICT (id_user, period) DO UPDATE SET
+        total = EXCLUDED.total,
+        id_cluster = EXCLUDED.id_cluster
+    RETURNING id, id_user, (xmax = 0) AS created
+'''
+
+
+def upsert_month_fees(rows, year, month):
+    """Simpan marketing fee bulan tertentu, rows berisi tuple (id_user, id_cluster, total).
+
+    Hasilnya dict {id_user: (id, 'created' | 'updated')}. Baris baru diberi time awal
+    bulan supaya masuk ke periode yang dimaksud, bukan bulan saat di-submit. id_user
+    dalam rows harus unik, ON CONFLICT tidak bisa mengubah baris yang sama dua kali.
+    """
+    if not rows:
+        return {}
+
+    period_start, _ = month_range(year, month)
+    period = period_key(year, month)
+    values = ', '.join(['(%s, %s, %s, %s, %s)'] * len(rows))
+    params = [
+        value
+        for id_user, id_cluster, total in rows
+        for value in (id_user, id_cluster, total, period_start, period)
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(UPSERT_MONTH_SQL.format(values=values), params)
+        results = {
+            id_user: (id_fee, 'created' if created else 'updated')
+            for id_fee, id_user, created in cursor.fetchall()
+        }
+
+    # SQL langsung tidak memicu signal, jadi cache dashboard dibuang manual
+    invalidate_users(results.keys())
+
+    return results
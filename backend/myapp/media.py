@@ -0,0 +1,142 @@
+import mimetypes
+import os
+import re
+from pathlib import Path
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_etags
+
+# Pengiriman file media (evidence, thumbnail). Di production byte file dikirim oleh
+# proxy depan: MEDIA_ACCEL='x-accel' (nginx, lewat location internal di
+# MEDIA_ACCEL_PREFIX) atau 'x-sendfile' (Apache/lighttpd). Tanpa itu Django
+# mengirim sendiri dengan FileResponse yang mendukung Range dan If-None-Match.
+MEDIA_ACCEL = os.getenv('MEDIA_ACCEL', '').lower()
+MEDIA_ACCEL_PREFIX = os.getenv('MEDIA_ACCEL_PREFIX', '/protected-media/')
+
+# Folder di MEDIA_ROOT yang boleh diakses. Nama file di sini tidak pernah dipakai
+# ulang untuk isi lain (hash atau timestamp), jadi boleh di-cache selamanya.
+MEDIA_DIRS = ('evidence', 'thumbs', 'upload')
+IMMUTABLE_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class _RangeFile:
+    """Bagian [start, start + length) dari sebuah file, untuk respons 206."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def media_file_path(relative_path):
+    """Path absolut file di MEDIA_ROOT, atau None jika di luar MEDIA_DIRS."""
+    root = Path(settings.MEDIA_ROOT).resolve()
+    path = (root / relative_path).resolve()
+    if not path.is_relative_to(root) or path == root:
+        return None
+    if path.relative_to(root).parts[0] not in MEDIA_DIRS:
+        return None
+    return path
+
+
+def _parse_range(header, size):
+    """(start, end) inklusif dari header Range, atau None jika tidak bisa dipakai.
+
+    Hanya satu range yang didukung; multi-range dijawab dengan file utuh.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or size == 0:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # bytes=-N: N byte terakhir, bytes=-0 tidak bisa dipenuhi
+        if int(last) == 0:
+            return None
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    return (start, end) if start <= end else None
+
+
+def _etag(path, stat):
+    # File evidence dinamai dengan sha256 isinya, itu ETag yang paling tepat
+    if len(path.stem) == 64:
+        return f'"{path.stem}"'
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def send_file(request, path, accel_path=None, cache_control=IMMUTABLE_CACHE_CONTROL):
+    """Respons untuk file `path`; `accel_path` adalah path-nya relatif ke MEDIA_ROOT."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+
+    etag = _etag(path, stat)
+    content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+
+    def _headers(response):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        response['Cache-Control'] = cache_control
+        return response
+
+    if etag in parse_etags(request.headers.get('If-None-Match', '')) or request.headers.get('If-None-Match') == '*':
+        return _headers(HttpResponseNotModified())
+
+    if accel_path and MEDIA_ACCEL == 'x-accel':
+        # nginx yang mengirim file, termasuk Range-nya
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + accel_path
+        return _headers(response)
+    if MEDIA_ACCEL == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = str(path)
+        return _headers(response)
+
+    size = stat.st_size
+    byte_range = None
+    range_header = request.headers.get('Range')
+    # If-Range: kirim sebagian hanya jika file-nya masih sama dengan yang dimiliki client
+    if range_header and request.headers.get('If-Range', etag) == etag:
+        byte_range = _parse_range(range_header, size)
+        if byte_range is None and RANGE_RE.match(range_header.strip()):
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if byte_range is None:
+        # File utuh; server WSGI bisa memakai sendfile() langsung dari file ini
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(_RangeFile(open(path, 'rb'), start, end - start + 1), content_type=content_type, status=206)
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    return _headers(response)
+
+
+def serve_media(request, relative_path):
+    """Respons untuk file di MEDIA_ROOT, atau None jika file tidak ada atau tidak boleh diakses."""
+    path = media_file_path(relative_path)
+    if path is None or not path.is_file():
+        return None
+    accel_path = path.relative_to(Path(settings.MEDIA_ROOT).resolve()).as_posix()
+    return send_file(request, path, accel_path)
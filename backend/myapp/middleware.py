@@ -0,0 +1,130 @@
+import hashlib
+import os
+import threading
+import time
+from collections import namedtuple
+import jwt
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.utils.decorators import sync_and_async_middleware
+from myapp.models import User
+
+# Principal user yang sedang login, dipasang di request.principal. Token JWT dari
+# user_login diverifikasi sekali per request, dan data user (role + scope) disimpan
+# di memori proses per jti supaya request berikutnya tidak perlu query ke database.
+MAX_AGE = 60  # detik, batas umur principal di cache
+MAX_ENTRIES = 10000
+
+Principal = namedtuple('Principal', [
+    'id_user', 'username', 'role', 'id_role', 'id_area', 'id_region', 'id_branch', 'id_cluster'
+])
+
+_lock = threading.Lock()
+_principals = {}  # jti -> (expires_at, Principal)
+
+
+def _token_from_request(request):
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        return header[len('Bearer '):].strip()
+    return request.COOKIES.get('auth_token')
+
+
+def _load_principal(payload):
+    row = User.objects.filter(id_user=payload.get('user_id')).values_list(
+        'id_user', 'username', 'id_role', 'id_area', 'id_region', 'id_branch', 'id_cluster'
+    ).first()
+    if row is None:
+        return None
+    id_user, username, id_role, id_area, id_region, id_branch, id_cluster = row
+    return Principal(id_user, username, payload.get('role'), id_role, id_area, id_region, id_branch, id_cluster)
+
+
+def _decode(token):
+    """Payload token dan key cache-nya, (None, None) jika token tidak valid."""
+    try:
+        payload = jwt.decode(token, os.getenv('SECRET_KEY'), algorithms=['HS256'])
+    except jwt.InvalidTokenError:
+        return None, None
+
+    # Token lama (sebelum ada jti) memakai hash token sebagai key
+    return payload, payload.get('jti') or hashlib.sha256(token.encode()).hexdigest()
+
+
+def _cached(key):
+    cached = _principals.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    return None
+
+
+def _remember(key, payload, principal):
+    # Jangan simpan lebih lama dari sisa umur token
+    now = time.monotonic()
+    ttl = min(MAX_AGE, payload['exp'] - time.time()) if 'exp' in payload else MAX_AGE
+    with _lock:
+        if len(_principals) >= MAX_ENTRIES:
+            for stale_key in [k for k, (expires_at, _) in _principals.items() if expires_at <= now]:
+                del _principals[stale_key]
+            if len(_principals) >= MAX_ENTRIES:
+                _principals.clear()
+        _principals[key] = (now + ttl, principal)
+
+
+def get_principal(token):
+    """Verifikasi token dan kembalikan Principal, None jika token tidak valid."""
+    payload, key = _decode(token)
+    if payload is None:
+        return None
+
+    principal = _cached(key)
+    if principal is None:
+        principal = _load_principal(payload)
+        if principal is None:
+            return None
+        _remember(key, payload, principal)
+    return principal
+
+
+async def aget_principal(token):
+    """get_principal untuk request async; query database hanya saat cache miss."""
+    payload, key = _decode(token)
+    if payload is None:
+        return None
+
+    principal = _cached(key)
+    if principal is None:
+        principal = await sync_to_async(_load_principal)(payload)
+        if principal is None:
+            return None
+        _remember(key, payload, principal)
+    return principal
+
+
+def forget_user(id_user):
+    """Buang principal milik user ini, dipanggil saat data user berubah."""
+    with _lock:
+        for key in [k for k, (_, principal) in _principals.items() if principal.id_user == id_user]:
+            del _principals[key]
+
+
+@sync_and_async_middleware
+def jwt_authentication_middleware(get_response):
+    """Pasang request.principal dari token auth_token (cookie) atau header Bearer.
+
+    Request tanpa token atau dengan token tidak valid tetap diteruskan dengan
+    request.principal = None; view yang butuh login yang memutuskan responsnya.
+    Mendukung sync dan async supaya view async (user_login) tidak dipaksa lewat
+    thread di bawah ASGI.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = _token_from_request(request)
+            request.principal = await aget_principal(token) if token else None
+            return await get_response(request)
+    else:
+        def middleware(request):
+            token = _token_from_request(request)
+            request.principal = get_principal(token) if token else None
+            return get_response(request)
+
+    return middleware
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.5 on 2026-10-18 14:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0004_area'),
+    ]
+
+    operations = [
+        # Tabel ringkasan dibuat manual karena semua model di app ini managed = False
+        migrations.RunSQL(
+            sql='''
+                CREATE TABLE IF NOT EXISTS "MonthlyUsage" (
+                    id bigserial PRIMARY KEY,
+                    id_user bigint NOT NULL REFERENCES "User" (id_user),
+                    id_poin bigint NOT NULL REFERENCES "Poin" (id_poin),
+                    year integer NOT NULL,
+                    month integer NOT NULL,
+                    total_amount double precision NOT NULL DEFAULT 0,
+                    report_count integer NOT NULL DEFAULT 0,
+                    pending_count integer NOT NULL DEFAULT 0,
+                    UNIQUE (id_user, id_poin, year, month)
+                );
+
+                INSERT INTO "MonthlyUsage" (id_user, id_poin, year, month, total_amount, report_count, pending_count)
+                SELECT id_user,
+                       id_poin,
+                       EXTRACT(YEAR FROM time AT TIME ZONE 'UTC')::integer,
+                       EXTRACT(MONTH FROM time AT TIME ZONE 'UTC')::integer,
+                       COALESCE(SUM(amount_used), 0),
+                       COUNT(*),
+                       COUNT(*) FILTER (WHERE status = false)
+                FROM "Report"
+                WHERE id_user IS NOT NULL AND id_poin IS NOT NULL AND time IS NOT NULL
+                GROUP BY 1, 2, 3, 4
+                ON CONFLICT (id_user, id_poin, year, month) DO UPDATE SET
+                    total_amount = EXCLUDED.total_amount,
+                    report_count = EXCLUDED.report_count,
+                    pending_count = EXCLUDED.pending_count;
+            ''',
+            reverse_sql='DROP TABLE IF EXISTS "MonthlyUsage";',
+        ),
+        migrations.CreateModel(
+            name='MonthlyUsage',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('total_amount', models.FloatField(default=0)),
+                ('report_count', models.IntegerField(default=0)),
+                ('pending_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'MonthlyUsage',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+
+# Model di app ini managed = False, jadi index dibuat langsung lewat SQL.
+# CONCURRENTLY supaya tabel tidak terkunci selama index dibangun.
+INDEXES = [
+    ('report_user_time_idx', '"Report" (id_user, time)', ''),
+    ('report_user_poin_time_idx', '"Report" (id_user, id_poin, time)', ''),
+    ('report_pending_user_time_idx', '"Report" (id_user, time)', 'WHERE status = false'),
+    ('recommendation_user_time_idx', '"Recommendation" (id_user, time)', ''),
+    ('recommendation_user_poin_time_idx', '"Recommendation" (id_user, id_poin, time)', ''),
+    ('marketingfee_user_time_idx', '"MarketingFee" (id_user, time)', ''),
+]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('myapp', '0005_monthlyusage'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target} {where};',
+            reverse_sql=f'DROP INDEX CONCURRENTLY IF EXISTS {name};',
+        )
+        for name, target, where in INDEXES
+    ]
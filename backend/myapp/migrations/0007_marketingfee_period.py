@@ -0,0 +1,44 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0006_period_indexes'),
+    ]
+
+    operations = [
+        # Kolom period (tanggal 1 bulan) + unique (id_user, period) supaya submit
+        # marketing fee bisa memakai INSERT ... ON CONFLICT. Migrasi ini tidak
+        # menghapus data: jika masih ada duplikat, migrate gagal dan duplikat harus
+        # dicek dan dihapus dulu lewat management command dedupe_marketingfee.
+        migrations.RunSQL(
+            sql='''
+                ALTER TABLE "MarketingFee" ADD COLUMN IF NOT EXISTS period date;
+
+                UPDATE "MarketingFee"
+                SET period = date_trunc('month', time AT TIME ZONE 'UTC')::date
+                WHERE period IS NULL AND time IS NOT NULL;
+
+                DO $$
+                BEGIN
+                    IF EXISTS (
+                        SELECT 1 FROM "MarketingFee"
+                        WHERE period IS NOT NULL
+                        GROUP BY id_user, period
+                        HAVING count(*) > 1
+                    ) THEN
+                        RAISE EXCEPTION 'MarketingFee has duplicate rows per user per month, run manage.py dedupe_marketingfee first';
+                    END IF;
+                END
+                $$;
+
+                CREATE UNIQUE INDEX IF NOT EXISTS marketingfee_user_period_uniq
+                    ON "MarketingFee" (id_user, period);
+            ''',
+            reverse_sql='''
+                DROP INDEX IF EXISTS marketingfee_user_period_uniq;
+                ALTER TABLE "MarketingFee" DROP COLUMN IF EXISTS period;
+            ''',
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0007_marketingfee_period'),
+    ]
+
+    operations = [
+        # Sama seperti MarketingFee: kolom period + unique (id_user, id_poin, period)
+        # supaya rekomendasi bisa di-upsert dan dibaca dengan point lookup.
+        # Jika masih ada duplikat, migrate gagal; cek dan hapus dulu lewat
+        # management command dedupe_recommendation.
+        migrations.RunSQL(
+            sql='''
+                ALTER TABLE "Recommendation" ADD COLUMN IF NOT EXISTS period date;
+
+                UPDATE "Recommendation"
+                SET period = date_trunc('month', time AT TIME ZONE 'UTC')::date
+                WHERE period IS NULL AND time IS NOT NULL;
+
+                DO $$
+                BEGIN
+                    IF EXISTS (
+                        SELECT 1 FROM "Recommendation"
+                        WHERE period IS NOT NULL
+                        GROUP BY id_user, id_poin, period
+                        HAVING count(*) > 1
+                    ) THEN
+                        RAISE EXCEPTION 'Recommendation has duplicate rows per user, poin and month, run manage.py dedupe_recommendation first';
+                    END IF;
+                END
+                $$;
+
+                CREATE UNIQUE INDEX IF NOT EXISTS recommendation_user_poin_period_uniq
+                    ON "Recommendation" (id_user, id_poin, period);
+            ''',
+            reverse_sql='''
+                DROP INDEX IF EXISTS recommendation_user_poin_period_uniq;
+                ALTER TABLE "Recommendation" DROP COLUMN IF EXISTS period;
+            ''',
+        ),
+    ]
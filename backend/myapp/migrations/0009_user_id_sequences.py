@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# Salinan ROLE_ID_RANGES di myapp.user_ids saat migration ini dibuat
+ROLE_ID_RANGES = {
+    1: (1000, 1999),
+    2: (2000, 2999),
+    3: (3000, 3999),
+    4: (4000, 4999),
+    5: (5000, 5999),
+    6: (6001, 9223372036854775807),
+}
+
+
+def create_sequence_sql(id_role, start, end):
+    # Sequence dimulai setelah id terbesar yang sudah terpakai di rentang role ini
+    return f'''
+        CREATE SEQUENCE IF NOT EXISTS user_id_role_{id_role}_seq
+            AS bigint MINVALUE {start} MAXVALUE {end} START {start};
+        SELECT setval(
+            'user_id_role_{id_role}_seq',
+            COALESCE((SELECT MAX(id_user) FROM "User" WHERE id_user BETWEEN {start} AND {end}), {start}),
+            EXISTS (SELECT 1 FROM "User" WHERE id_user BETWEEN {start} AND {end})
+        );
+    '''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0008_recommendation_period'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=create_sequence_sql(id_role, start, end),
+            reverse_sql=f'DROP SEQUENCE IF EXISTS user_id_role_{id_role}_seq;',
+        )
+        for id_role, (start, end) in ROLE_ID_RANGES.items()
+    ]
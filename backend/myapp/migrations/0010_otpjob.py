@@ -0,0 +1,47 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0009_user_id_sequences'),
+    ]
+
+    operations = [
+        # Antrian pengiriman OTP, diproses management command otp_worker
+        migrations.RunSQL(
+            sql='''
+                CREATE TABLE IF NOT EXISTS "OtpJob" (
+                    id bigserial PRIMARY KEY,
+                    no_telp varchar(32) NOT NULL,
+                    status varchar(16) NOT NULL DEFAULT 'pending',
+                    attempts integer NOT NULL DEFAULT 0,
+                    run_at timestamptz NOT NULL DEFAULT now(),
+                    locked_at timestamptz,
+                    last_error text,
+                    created_at timestamptz NOT NULL DEFAULT now()
+                );
+
+                CREATE INDEX IF NOT EXISTS otpjob_pending_run_at_idx
+                    ON "OtpJob" (run_at) WHERE status = 'pending';
+            ''',
+            reverse_sql='DROP TABLE IF EXISTS "OtpJob";',
+        ),
+        migrations.CreateModel(
+            name='OtpJob',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('no_telp', models.CharField(max_length=32)),
+                ('status', models.CharField(default='pending', max_length=16)),
+                ('attempts', models.IntegerField(default=0)),
+                ('run_at', models.DateTimeField()),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'OtpJob',
+                'managed': False,
+            },
+        ),
+    ]
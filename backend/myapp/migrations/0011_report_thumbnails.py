@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0010_otpjob'),
+    ]
+
+    operations = [
+        # URL thumbnail evidence per ukuran. Report lama ikut diproses karena NULL.
+        migrations.RunSQL(
+            sql='''
+                ALTER TABLE "Report" ADD COLUMN IF NOT EXISTS thumbnails jsonb;
+
+                CREATE INDEX IF NOT EXISTS report_thumbnails_pending_idx
+                    ON "Report" (id) WHERE thumbnails IS NULL;
+            ''',
+            reverse_sql='''
+                DROP INDEX IF EXISTS report_thumbnails_pending_idx;
+                ALTER TABLE "Report" DROP COLUMN IF EXISTS thumbnails;
+            ''',
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0011_report_thumbnails'),
+    ]
+
+    operations = [
+        # File evidence berdasarkan hash isinya, dipakai bersama oleh report dengan file sama
+        migrations.RunSQL(
+            sql='''
+                CREATE TABLE IF NOT EXISTS "EvidenceBlob" (
+                    sha256 char(64) PRIMARY KEY,
+                    path varchar(255) NOT NULL UNIQUE,
+                    size bigint NOT NULL,
+                    ref_count integer NOT NULL DEFAULT 1,
+                    created_at timestamptz NOT NULL DEFAULT now()
+                );
+            ''',
+            reverse_sql='DROP TABLE IF EXISTS "EvidenceBlob";',
+        ),
+        migrations.CreateModel(
+            name='EvidenceBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('path', models.CharField(max_length=255, unique=True)),
+                ('size', models.BigIntegerField()),
+                ('ref_count', models.IntegerField(default=1)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'EvidenceBlob',
+                'managed': False,
+            },
+        ),
+    ]
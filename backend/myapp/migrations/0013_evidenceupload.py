@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0012_evidenceblob'),
+    ]
+
+    operations = [
+        # Sesi upload evidence bertahap (resumable); isi file-nya di MEDIA_ROOT/tmp/<id>
+        migrations.RunSQL(
+            sql='''
+                CREATE TABLE IF NOT EXISTS "EvidenceUpload" (
+                    id uuid PRIMARY KEY,
+                    extension varchar(8) NOT NULL,
+                    size bigint NOT NULL,
+                    sha256 char(64) NOT NULL,
+                    created_at timestamptz NOT NULL DEFAULT now()
+                );
+
+                CREATE INDEX IF NOT EXISTS evidenceupload_created_at_idx
+                    ON "EvidenceUpload" (created_at);
+            ''',
+            reverse_sql='DROP TABLE IF EXISTS "EvidenceUpload";',
+        ),
+        migrations.CreateModel(
+            name='EvidenceUpload',
+            fields=[
+                ('id', models.UUIDField(primary_key=True, serialize=False)),
+                ('extension', models.CharField(max_length=8)),
+                ('size', models.BigIntegerField()),
+                ('sha256', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'EvidenceUpload',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('myapp', '0013_evidenceupload'),
+    ]
+
+    operations = [
+        # Antrian approval lintas user (api/approvals/pending) diurutkan (time, id);
+        # report_pending_user_time_idx dari 0006 tetap dipakai untuk scope kecil
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS report_pending_time_id_idx ON "Report" (time, id) WHERE status = false;',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS report_pending_time_id_idx;',
+        ),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0014_report_pending_time_index'),
+    ]
+
+    operations = [
+        # Tanda report sedang dibuatkan thumbnail oleh worker, supaya pembuatan
+        # thumbnail tidak perlu menahan lock baris Report selama gambar diproses
+        migrations.RunSQL(
+            sql='ALTER TABLE "Report" ADD COLUMN IF NOT EXISTS thumbnail_locked_at timestamptz;',
+            reverse_sql='ALTER TABLE "Report" DROP COLUMN IF EXISTS thumbnail_locked_at;',
+        ),
+    ]
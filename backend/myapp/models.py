@@ -33,16 +33,77 @@ class Cluster(models.Model):
         app_label = "myapp"
 
 
+class EvidenceBlob(models.Model):
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    path = models.CharField(max_length=255, unique=True)  # relatif terhadap MEDIA_ROOT/evidence
+    size = models.BigIntegerField()
+    ref_count = models.IntegerField(default=1)  # jumlah report yang memakai file ini
+    created_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = 'EvidenceBlob'
+        app_label = "myapp"
+
+
+class EvidenceUpload(models.Model):
+    id = models.UUIDField(primary_key=True)
+    extension = models.CharField(max_length=8)
+    size = models.BigIntegerField()  # ukuran total yang dijanjikan client
+    sha256 = models.CharField(max_length=64)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = 'EvidenceUpload'
+        app_label = "myapp"
+
+
 class Marketingfee(models.Model):
     id = models.BigAutoField(primary_key=True)
     id_user = models.ForeignKey('User', models.DO_NOTHING, db_column='id_user', blank=True, null=True)
     id_cluster = models.ForeignKey('Cluster', models.DO_NOTHING, db_column='id_cluster', blank=True, null=True)
     time = models.DateTimeField(blank=True, null=True)
     total = models.FloatField(blank=True, null=True)
+    period = models.DateField(blank=True, null=True)  # tanggal 1 bulan marketing fee
 
     class Meta:
         managed = False
         db_table = 'MarketingFee'
+        unique_together = (('id_user', 'period'),)
+        app_label = "myapp"
+
+
+class MonthlyUsage(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    id_user = models.ForeignKey('User', models.DO_NOTHING, db_column='id_user')
+    id_poin = models.ForeignKey('Poin', models.DO_NOTHING, db_column='id_poin')
+    year = models.IntegerField()
+    month = models.IntegerField()
+    total_amount = models.FloatField(default=0)
+    report_count = models.IntegerField(default=0)
+    pending_count = models.IntegerField(default=0)
+
+    class Meta:
+        managed = False
+        db_table = 'MonthlyUsage'
+        app_label = "myapp"
+        unique_together = (('id_user', 'id_poin', 'year', 'month'),)
+
+
+class OtpJob(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    no_telp = models.CharField(max_length=32)
+    status = models.CharField(max_length=16, default='pending')  # pending, running, sent, failed
+    attempts = models.IntegerField(default=0)
+    run_at = models.DateTimeField()
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = 'OtpJob'
         app_label = "myapp"
 
 
@@ -62,10 +123,12 @@ class Recommendation(models.Model):
     id_poin = models.ForeignKey(Poin, models.DO_NOTHING, db_column='id_poin', blank=True, null=True)
     time = models.DateTimeField(blank=True, null=True)
     recommend = models.FloatField(blank=True, null=True)
+    period = models.DateField(blank=True, null=True)  # tanggal 1 bulan rekomendasi
 
     class Meta:
         managed = False
         db_table = 'Recommendation'
+        unique_together = (('id_user', 'id_poin', 'period'),)
         app_label = "myapp"
 
 
@@ -90,6 +153,8 @@ class Report(models.Model):
     time = models.DateTimeField(blank=True, null=True)
     status = models.BooleanField()
     approved_at = models.DateTimeField(blank=True, null=True)
+    thumbnails = models.JSONField(blank=True, null=True)  # {ukuran: url}, NULL = belum diproses
+    thumbnail_locked_at = models.DateTimeField(blank=True, null=True)  # sedang diproses worker thumbnail
 
     class Meta:
         managed = False
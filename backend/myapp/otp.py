@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+from datetime import timedelta
+from django.db import connection, transaction
+from django.utils import timezone
+from myapp.models import OtpJob
+
+# Pengiriman OTP lewat antrian di tabel OtpJob: request HTTP hanya menambah job,
+# management command otp_worker yang memanggil provider SMS (Twilio) dengan retry
+# dan backoff. Provider dipilih lewat OTP_PROVIDER ('twilio' atau 'fake').
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 5  # detik, dikali 2^(percobaan - 1)
+BACKOFF_MAX = 300
+LOCK_TIMEOUT = 120  # detik, job 'running' lebih lama dari ini dianggap worker-nya mati
+SEND_TIMEOUT = 30  # detik, batas satu request ke provider, harus jauh di bawah LOCK_TIMEOUT
+
+_provider_lock = threading.Lock()
+_provider = None
+
+
+class TwilioProvider:
+    """Twilio Verify, satu Client dipakai ulang untuk semua request."""
+
+    def __init__(self):
+        from twilio.http.http_client import TwilioHttpClient
+        from twilio.rest import Client
+        self.client = Client(
+            os.getenv('account_sid'),
+            os.getenv('auth_token'),
+            http_client=TwilioHttpClient(timeout=SEND_TIMEOUT)
+        )
+        self.service = self.client.verify.services(os.getenv('service_id'))
+
+    def send(self, no_telp):
+        return self.service.verifications.create(to=no_telp, channel="sms").status
+
+    def check(self, no_telp, code):
+        return self.service.verification_checks.create(to=no_telp, code=code).status
+
+
+class FakeProvider:
+    """Pengganti Twilio untuk development dan load test, tanpa SMS sungguhan.
+
+    Semua nomor menerima kode OTP_FAKE_CODE. OTP_FAKE_DELAY (detik) mensimulasikan
+    provider yang lambat.
+    """
+
+    def __init__(self):
+        self.code = os.getenv('OTP_FAKE_CODE', '123456')
+        self.delay = float(os.getenv('OTP_FAKE_DELAY', '0'))
+
+    def send(self, no_telp):
+        time.sleep(self.delay)
+        print(f"[fake otp] {no_telp}: {self.code}")
+        return 'pending'
+
+    def check(self, no_telp, code):
+        time.sleep(self.delay)
+        return 'approved' if code == self.code else 'pending'
+
+
+PROVIDERS = {
+    'twilio': TwilioProvider,
+    'fake': FakeProvider,
+}
+
+
+def get_provider():
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = PROVIDERS[os.getenv('OTP_PROVIDER', 'twilio')]()
+    return _provider
+
+
+def enqueue_otp(no_telp):
+    now = timezone.now()
+    return OtpJob.objects.create(no_telp=no_telp, status='pending', run_at=now, created_at=now)
+
+
+def claim_jobs(limit):
+    """Ambil dan kunci job yang siap dijalankan, aman dipakai beberapa worker sekaligus.
+
+    Job 'running' yang worker-nya mati atau macet dihitung sebagai satu percobaan
+    gagal saat diambil ulang, jadi job yang selalu membuat worker macet berhenti
+    (status 'failed') setelah MAX_ATTEMPTS dan tidak mengirim SMS terus-menerus.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute('''
+                UPDATE "OtpJob" SET
+                    attempts = attempts + CASE WHEN status = 'running' THEN 1 ELSE 0 END,
+                    last_error = CASE WHEN status = 'running' THEN 'worker timed out' ELSE last_error END,
+                    status = CASE
+                        WHEN status = 'running' AND attempts + 1 >= %s THEN 'failed'
+                        ELSE 'running'
+                    END,
+                    locked_at = CASE
+                        WHEN status = 'running' AND attempts + 1 >= %s THEN NULL
+                        ELSE now()
+                    END
+                WHERE id IN (
+                    SELECT id FROM "OtpJob"
+                    WHERE (status = 'pending' AND run_at <= now())
+                       OR (status = 'running' AND locked_at < now() - %s * interval '1 second')
+                    ORDER BY run_at
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, no_telp, attempts, locked_at, status
+            ''', [MAX_ATTEMPTS, MAX_ATTEMPTS, LOCK_TIMEOUT, limit])
+            return [row[:4] for row in cursor.fetchall() if row[4] == 'running']
+
+
+def backoff(attempts):
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+
+def run_job(id_job, no_telp, attempts, locked_at):
+    """Kirim satu OTP, hasilnya status akhir job ('sent', 'pending', 'failed' atau 'lost').
+
+    Sebelum mengirim, locked_at diperbarui supaya job yang menunggu giliran di
+    batch tidak dianggap macet oleh worker lain. Semua update hanya berlaku selama
+    job masih milik worker ini (status 'running' dengan locked_at yang sama); jika
+    job sudah diambil worker lain hasilnya 'lost' dan SMS tidak dikirim.
+    """
+    claimed_at = timezone.now()
+    if not OtpJob.objects.filter(id=id_job, status='running', locked_at=locked_at).update(locked_at=claimed_at):
+        return 'lost'
+    owned = OtpJob.objects.filter(id=id_job, status='running', locked_at=claimed_at)
+
+    attempts += 1
+    try:
+        get_provider().send(no_telp)
+    except Exception as e:
+        status = 'failed' if attempts >= MAX_ATTEMPTS else 'pending'
+        updated = owned.update(
+            status=status,
+            attempts=attempts,
+            run_at=timezone.now() + timedelta(seconds=backoff(attempts)),
+            locked_at=None,
+            last_error=str(e)
+        )
+        return status if updated else 'lost'
+
+    updated = owned.update(status='sent', attempts=attempts, locked_at=None, last_error=None)
+    return 'sent' if updated else 'lost'
+
+
+def check_otp(no_telp, code):
+    """Verifikasi kode OTP secara langsung (butuh jawaban saat itu juga)."""
+    return get_provider().check(no_telp, code)
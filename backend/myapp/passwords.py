@@ -0,0 +1,56 @@
+import asyncio
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+
+# bcrypt sengaja lambat (~250ms per hash di cost 12). Di login async hashing
+# dijalankan di thread pool terbatas supaya event loop tidak tertahan dan lonjakan
+# login tidak menghabiskan semua thread. bcrypt melepas GIL selama hashing.
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+BCRYPT_WORKERS = int(os.getenv('BCRYPT_WORKERS', '4'))
+
+_executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix='bcrypt')
+
+
+def is_bcrypt_hash(stored):
+    return stored.startswith('$2b$') or stored.startswith('$2a$')
+
+
+def hash_password(password):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
+
+
+def _needs_rehash(stored):
+    # Format hash: $2b$<cost>$<salt+hash>
+    try:
+        return int(stored.split('$')[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+def verify_password(password, stored):
+    """Cek password, hasilnya (valid, hash baru atau None).
+
+    Hash baru diberikan jika password valid tapi masih plain text (user lama) atau
+    cost hash-nya beda dengan BCRYPT_ROUNDS, supaya bisa disimpan ulang.
+    """
+    if is_bcrypt_hash(stored):
+        try:
+            valid = bcrypt.checkpw(password.encode('utf-8'), stored.encode('utf-8'))
+        except ValueError as e:
+            print(f"Bcrypt error: {str(e)}")
+            valid = False
+        rehash = valid and _needs_rehash(stored)
+    else:
+        # Password lama (plain text), verifikasi langsung
+        valid = hmac.compare_digest(stored.encode('utf-8'), password.encode('utf-8'))
+        rehash = valid
+
+    return valid, hash_password(password) if rehash else None
+
+
+async def averify_password(password, stored):
+    """verify_password di thread pool bcrypt, untuk dipakai dari view async."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, verify_password, password, stored)
@@ -0,0 +1,79 @@
+import json
+from django.db import connection
+from django.db.models import F, Q
+from myapp.models import Report
+from myapp.report_pages import DEFAULT_LIMIT, decode_cursor, encode_cursor
+
+# Antrian report yang menunggu approval untuk satu scope, urut dari yang paling
+# lama (time, id). Query memakai partial index WHERE status = false, jadi ukurannya
+# mengikuti jumlah report pending, bukan seluruh tabel Report.
+COUNT_LIMIT = 1000  # di atas ini jumlah pending diambil dari estimasi planner
+
+
+def _pending_reports(cluster_ids):
+    return Report.objects.filter(
+        status=False,
+        time__isnull=False,
+        id_user__id_cluster__in=cluster_ids
+    )
+
+
+def _estimate_rows(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def pending_count(cluster_ids):
+    """Jumlah report pending, hasilnya (jumlah, exact).
+
+    Dihitung pasti sampai COUNT_LIMIT; antrian yang lebih besar memakai estimasi
+    planner supaya count tidak perlu membaca seluruh antrian.
+    """
+    queryset = _pending_reports(cluster_ids).values('id')
+    count = queryset[:COUNT_LIMIT + 1].count()
+    if count <= COUNT_LIMIT:
+        return count, True
+    return max(_estimate_rows(queryset), count), False
+
+
+def pending_page(cluster_ids, limit=DEFAULT_LIMIT, cursor=None):
+    """Satu halaman antrian approval, lengkap dengan nama user, cluster dan poin.
+
+    Hasilnya {'reports': [...], 'next_cursor': ...}; next_cursor None di halaman terakhir.
+    """
+    reports = _pending_reports(cluster_ids).order_by('time', 'id').values(
+        'id', 'description', 'amount_used', 'image_url', 'time',
+        'id_user_id', 'id_poin_id',
+        username=F('id_user__username'),
+        id_cluster=F('id_user__id_cluster'),
+        cluster=F('id_user__id_cluster__cluster'),
+        poin=F('id_poin__type')
+    )
+
+    if cursor:
+        last_time, last_id = decode_cursor(cursor)
+        reports = reports.filter(Q(time__gt=last_time) | Q(time=last_time, id__gt=last_id))
+
+    # Ambil satu baris lebih untuk tahu apakah masih ada halaman berikutnya
+    rows = list(reports[:limit + 1])
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        'reports': [{
+            'id': row['id'],
+            'description': row['description'],
+            'amount_used': row['amount_used'],
+            'image_url': row['image_url'],
+            'time': row['time'].isoformat(),
+            'user': {'id_user': row['id_user_id'], 'username': row['username']},
+            'cluster': {'id_cluster': row['id_cluster'], 'cluster': row['cluster']},
+            'poin': {'id_poin': row['id_poin_id'], 'type': row['poin']}
+        } for row in rows],
+        'next_cursor': encode_cursor(rows[-1]['time'], rows[-1]['id']) if has_next else None
+    }
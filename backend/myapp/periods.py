@@ -0,0 +1,54 @@
+from datetime import date, datetime
+from django.utils import timezone
+
+# Filter periode memakai rentang waktu setengah terbuka [awal, akhir) supaya index
+# pada kolom time bisa dipakai. Lookup time__month / time__year dengan USE_TZ
+# dikompilasi jadi EXTRACT(... AT TIME ZONE ...) yang memaksa full scan.
+
+MONTHS = {
+    'Januari': 1, 'Februari': 2, 'Maret': 3, 'April': 4,
+    'Mei': 5, 'Juni': 6, 'Juli': 7, 'Agustus': 8,
+    'September': 9, 'Oktober': 10, 'November': 11, 'Desember': 12
+}
+
+
+def parse_month(month, default=None):
+    """Terima angka bulan atau nama bulan (Indonesia), default bulan sekarang."""
+    if isinstance(month, int):
+        return month
+    if month and str(month).isdigit():
+        return int(month)
+    if month in MONTHS:
+        return MONTHS[month]
+    return default if default is not None else datetime.now().month
+
+
+def month_range(year, month):
+    """Rentang [awal bulan, awal bulan berikutnya) yang timezone-aware."""
+    year, month = int(year), int(month)
+    start = timezone.make_aware(datetime(year, month, 1))
+    if month == 12:
+        end = timezone.make_aware(datetime(year + 1, 1, 1))
+    else:
+        end = timezone.make_aware(datetime(year, month + 1, 1))
+    return start, end
+
+
+def period_key(year, month):
+    """Nilai kolom period (tanggal 1 bulan) di MarketingFee dan Recommendation."""
+    return date(int(year), int(month), 1)
+
+
+def year_range(year):
+    """Rentang [awal tahun, awal tahun berikutnya) yang timezone-aware."""
+    year = int(year)
+    return (
+        timezone.make_aware(datetime(year, 1, 1)),
+        timezone.make_aware(datetime(year + 1, 1, 1)),
+    )
+
+
+def period_filter(year, month=None, field='time'):
+    """Kwargs filter ORM untuk satu bulan, atau satu tahun jika month kosong."""
+    start, end = month_range(year, month) if month else year_range(year)
+    return {f'{field}__gte': start, f'{field}__lt': end}
@@ -0,0 +1,170 @@
+import threading
+import time
+from collections import namedtuple
+from myapp.models import Area, Region, Branch, Cluster, Poin, Role, User
+from myapp.versions import get_version, bump_version
+
+# Data referensi (poin, role, hirarki area/region/branch/cluster dan user cluster)
+# jarang berubah, jadi disimpan di memori proses. Versi disimpan di Django cache
+# supaya worker lain ikut membangun ulang snapshot setelah ada perubahan.
+VERSION_KEY = 'refdata:version'
+MAX_AGE = 300  # detik, batas atas umur snapshot jika cache tidak dibagi antar proses
+
+ClusterUser = namedtuple('ClusterUser', ['id_user', 'username', 'telp'])
+
+_lock = threading.Lock()
+_snapshot = None
+
+
+class RefData:
+    def __init__(self, version):
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+        self.poin = list(Poin.objects.order_by('id_poin').values('id_poin', 'type'))
+        self.roles = dict(Role.objects.values_list('id_role', 'role'))
+
+        self.areas = dict(Area.objects.order_by('id_area').values_list('id_area', 'area'))
+        self.regions = {}
+        self.branches = {}
+        self.clusters = {}
+        self.regions_by_area = {}
+        self.branches_by_region = {}
+        self.clusters_by_branch = {}
+
+        for id_region, name, id_area in Region.objects.order_by('id_region').values_list('id_region', 'region', 'id_area'):
+            self.regions[id_region] = {'name': name, 'id_area': id_area}
+            self.regions_by_area.setdefault(id_area, []).append(id_region)
+
+        for id_branch, name, id_region in Branch.objects.order_by('id_branch').values_list('id_branch', 'branch', 'id_region'):
+            self.branches[id_branch] = {'name': name, 'id_region': id_region}
+            self.branches_by_region.setdefault(id_region, []).append(id_branch)
+
+        for id_cluster, name, id_branch in Cluster.objects.order_by('id_cluster').values_list('id_cluster', 'cluster', 'id_branch'):
+            self.clusters[id_cluster] = {'name': name, 'id_branch': id_branch}
+            self.clusters_by_branch.setdefault(id_branch, []).append(id_cluster)
+
+        # User biasa (id_role=6) per cluster
+        self.cluster_users = {}
+        for id_user, username, telp, id_cluster in User.objects.filter(
+            id_role=6,
+            id_cluster__isnull=False
+        ).order_by('id_user').values_list('id_user', 'username', 'telp', 'id_cluster'):
+            self.cluster_users.setdefault(id_cluster, ClusterUser(id_user, username, telp))
+
+
+def current_version():
+    return get_version(VERSION_KEY)
+
+
+def get_refdata():
+    """Snapshot data referensi, dibangun ulang jika versinya sudah berubah."""
+    global _snapshot
+    version = current_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version and time.monotonic() - snapshot.loaded_at < MAX_AGE:
+        return snapshot
+
+    with _lock:
+        snapshot = _snapshot
+        if snapshot is None or snapshot.version != version or time.monotonic() - snapshot.loaded_at >= MAX_AGE:
+            snapshot = RefData(version)
+            _snapshot = snapshot
+    return snapshot
+
+
+def invalidate():
+    """Naikkan versi agar semua proses membangun ulang snapshot."""
+    global _snapshot
+    bump_version(VERSION_KEY)
+    _snapshot = None
+
+
+def _to_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def poin_types():
+    return get_refdata().poin
+
+
+def list_areas():
+    return [
+        {'id_area': id_area, 'area': name}
+        for id_area, name in get_refdata().areas.items()
+    ]
+
+
+def list_regions(id_area):
+    data = get_refdata()
+    return [
+        {'id_region': id_region, 'region': data.regions[id_region]['name']}
+        for id_region in data.regions_by_area.get(_to_id(id_area), [])
+    ]
+
+
+def list_branches(id_region):
+    data = get_refdata()
+    return [
+        {'id_branch': id_branch, 'branch': data.branches[id_branch]['name']}
+        for id_branch in data.branches_by_region.get(_to_id(id_region), [])
+    ]
+
+
+def list_clusters(id_branch):
+    data = get_refdata()
+    return [
+        {'id_cluster': id_cluster, 'cluster': data.clusters[id_cluster]['name']}
+        for id_cluster in data.clusters_by_branch.get(_to_id(id_branch), [])
+    ]
+
+
+def get_region(id_region):
+    return get_refdata().regions.get(_to_id(id_region))
+
+
+def get_branch(id_branch):
+    return get_refdata().branches.get(_to_id(id_branch))
+
+
+def cluster_in_branch(id_cluster, id_branch):
+    cluster = get_refdata().clusters.get(_to_id(id_cluster))
+    return cluster is not None and cluster['id_branch'] == _to_id(id_branch)
+
+
+def get_cluster_user(id_cluster):
+    """User biasa (id_role=6) milik cluster, raise User.DoesNotExist jika tidak ada."""
+    cluster_user = get_refdata().cluster_users.get(_to_id(id_cluster))
+    if cluster_user is None:
+        raise User.DoesNotExist(f"No cluster user for cluster {id_cluster}")
+    return cluster_user
+
+
+def clusters_in_scope(scope, scope_id):
+    """Id semua cluster di bawah area/region/branch/cluster, None jika scope tidak dikenal."""
+    data = get_refdata()
+    scope_id = _to_id(scope_id)
+
+    if scope == 'cluster':
+        return [scope_id] if scope_id in data.clusters else []
+    if scope == 'branch':
+        branch_ids = [scope_id]
+    elif scope == 'region':
+        branch_ids = data.branches_by_region.get(scope_id, [])
+    elif scope == 'area':
+        branch_ids = [
+            id_branch
+            for id_region in data.regions_by_area.get(scope_id, [])
+            for id_branch in data.branches_by_region.get(id_region, [])
+        ]
+    else:
+        return None
+
+    return [
+        id_cluster
+        for id_branch in branch_ids
+        for id_cluster in data.clusters_by_branch.get(id_branch, [])
+    ]
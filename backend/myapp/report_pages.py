@@ -0,0 +1,72 @@
+import base64
+from datetime import datetime
+from django.db.models import Q
+from myapp.models import Report
+from myapp.periods import period_filter
+
+# Daftar report per bulan dipaginasi dengan keyset (time, id): halaman berikutnya
+# diambil dengan WHERE (time, id) > (time, id) terakhir, jadi tetap cepat dan
+# stabil walaupun ada report baru masuk di tengah-tengah.
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def encode_cursor(time, id_report):
+    raw = f'{time.isoformat()}|{id_report}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Kebalikan encode_cursor, raise ValueError jika cursor tidak valid."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        time, id_report = raw.split('|')
+        return datetime.fromisoformat(time), int(id_report)
+    except (TypeError, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
+
+
+def parse_limit(limit):
+    if limit and str(limit).isdigit():
+        return max(1, min(int(limit), MAX_LIMIT))
+    return DEFAULT_LIMIT
+
+
+def serialize_report(report):
+    return {
+        'id': report.id,
+        'id_user_id': report.id_user_id,
+        'id_poin_id': report.id_poin_id,
+        'description': report.description,
+        'amount_used': report.amount_used,
+        'image_url': report.image_url,
+        'thumbnails': report.thumbnails or {},
+        'time': report.time.isoformat(),
+        'status': report.status,
+        'approved_at': report.approved_at.isoformat() if report.approved_at else None
+    }
+
+
+def report_page(id_user, year, month, limit=DEFAULT_LIMIT, cursor=None):
+    """Satu halaman report user pada bulan tertentu, urut (time, id).
+
+    Hasilnya {'reports': [...], 'next_cursor': ...}; next_cursor None di halaman terakhir.
+    """
+    reports = Report.objects.filter(
+        id_user=id_user,
+        **period_filter(year, month)
+    ).order_by('time', 'id')
+
+    if cursor:
+        last_time, last_id = decode_cursor(cursor)
+        reports = reports.filter(Q(time__gt=last_time) | Q(time=last_time, id__gt=last_id))
+
+    # Ambil satu baris lebih untuk tahu apakah masih ada halaman berikutnya
+    rows = list(reports[:limit + 1])
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        'reports': [serialize_report(report) for report in rows],
+        'next_cursor': encode_cursor(rows[-1].time, rows[-1].id) if has_next else None
+    }
@@ -0,0 +1,122 @@
+import os
+import re
+import uuid
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from myapp.evidence_storage import TMP_DIR, StagedUpload
+from myapp.models import EvidenceUpload
+
+# Upload evidence bertahap: init (ukuran + sha256) -> PUT potongan file dengan
+# offset -> finalize. Potongan langsung ditambahkan ke file tmp di disk, jadi
+# memori per request dibatasi READ_SIZE dan upload yang putus cukup dilanjutkan
+# dari offset terakhir (= ukuran file tmp).
+MAX_UPLOAD_SIZE = int(os.getenv('MAX_UPLOAD_SIZE', str(25 * 1024 * 1024)))
+MAX_CHUNK_SIZE = 5 * 1024 * 1024
+READ_SIZE = 64 * 1024
+EXPIRE_AFTER = timedelta(hours=24)
+
+SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+class UploadError(Exception):
+    """Request upload tidak valid; `status` adalah HTTP status untuk client."""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+def upload_path(upload):
+    return TMP_DIR / str(upload.id)
+
+
+def received_bytes(upload):
+    path = upload_path(upload)
+    return path.stat().st_size if path.exists() else 0
+
+
+def start_upload(extension, size, sha256):
+    if size <= 0 or size > MAX_UPLOAD_SIZE:
+        raise UploadError(f'File size must be between 1 and {MAX_UPLOAD_SIZE} bytes')
+    if not SHA256_RE.match(sha256):
+        raise UploadError('Invalid sha256')
+
+    TMP_DIR.mkdir(parents=True, exist_ok=True)
+    upload = EvidenceUpload.objects.create(
+        id=uuid.uuid4(),
+        extension=extension,
+        size=size,
+        sha256=sha256,
+        created_at=timezone.now()
+    )
+    upload_path(upload).touch()
+    return upload
+
+
+def append_chunk(upload_id, offset, stream, length):
+    """Tambahkan `length` byte dari `stream` di posisi `offset`, hasilnya offset baru.
+
+    Offset harus sama dengan jumlah byte yang sudah diterima; jika tidak (misalnya
+    client mengirim ulang potongan yang sebenarnya sudah sampai) UploadError 409
+    berisi offset yang benar. Baris upload dikunci supaya PUT bersamaan untuk
+    upload yang sama tidak saling menimpa.
+    """
+    if length <= 0 or length > MAX_CHUNK_SIZE:
+        raise UploadError(f'Chunk size must be between 1 and {MAX_CHUNK_SIZE} bytes')
+
+    with transaction.atomic():
+        upload = EvidenceUpload.objects.select_for_update().get(id=upload_id)
+        received = received_bytes(upload)
+        if offset != received:
+            raise UploadError('Offset mismatch', status=409, offset=received)
+        if received + length > upload.size:
+            raise UploadError('Chunk exceeds declared file size', offset=received)
+
+        written = 0
+        with open(upload_path(upload), 'ab') as destination:
+            while written < length:
+                data = stream.read(min(READ_SIZE, length - written))
+                if not data:
+                    break
+                destination.write(data)
+                written += len(data)
+
+        # Koneksi putus di tengah potongan: yang sudah tertulis tetap disimpan,
+        # client melanjutkan dari offset ini
+        return received + written
+
+
+def finish_upload(upload_id):
+    """Cek ukuran dan sha256 file yang sudah lengkap, hasilnya (upload, StagedUpload).
+
+    Jika sha256 tidak cocok file dan sesi upload dihapus; client harus mulai lagi.
+    """
+    upload = EvidenceUpload.objects.get(id=upload_id)
+    received = received_bytes(upload)
+    if received != upload.size:
+        raise UploadError('Upload incomplete', offset=received)
+
+    staged = StagedUpload.from_path(upload_path(upload), upload.extension)
+    if staged.sha256 != upload.sha256:
+        discard_upload(upload)
+        raise UploadError('Checksum mismatch, upload must be restarted', status=422)
+    return upload, staged
+
+
+def discard_upload(upload):
+    path = upload_path(upload)
+    if path.exists():
+        path.unlink()
+    upload.delete()
+
+
+def expire_uploads():
+    """Hapus upload yang tidak selesai dalam EXPIRE_AFTER, hasilnya jumlah upload."""
+    expired = EvidenceUpload.objects.filter(created_at__lt=timezone.now() - EXPIRE_AFTER)
+    count = 0
+    for upload in expired:
+        discard_upload(upload)
+        count += 1
+    return count
@@ -0,0 +1,103 @@
+from django.db import connection
+from myapp.periods import month_range
+from myapp.refdata import get_refdata
+
+# Nilai GROUPING(id_region, id_branch, id_cluster) untuk tiap grouping set.
+# Bit bernilai 1 berarti kolom tersebut di-rollup (tidak ikut di-group).
+LEVEL_REGION = 0b011
+LEVEL_BRANCH = 0b101
+LEVEL_CLUSTER = 0b110
+LEVEL_TOTAL = 0b111
+
+# Usage (Report) dan marketing fee (MarketingFee) satu bulan digabung jadi satu
+# tabel fakta, lalu di-aggregate untuk semua level hirarki dalam satu query.
+AREA_ROLLUP_SQL = '''
+    WITH facts AS (
+        SELECT u.id_region, u.id_branch, u.id_cluster,
+               r.amount_used AS usage, 0::double precision AS fee
+        FROM "Report" r
+        JOIN "User" u ON u.id_user = r.id_user
+        WHERE r.time >= %s AND r.time < %s
+        UNION ALL
+        SELECT u.id_region, u.id_branch, u.id_cluster,
+               0::double precision AS usage, m.total AS fee
+        FROM "MarketingFee" m
+        JOIN "User" u ON u.id_user = m.id_user
+        WHERE m.time >= %s AND m.time < %s
+    )
+    SELECT id_region, id_branch, id_cluster,
+           GROUPING(id_region, id_branch, id_cluster) AS level,
+           COALESCE(SUM(usage), 0) AS total_usage,
+           COALESCE(SUM(fee), 0) AS total_fee
+    FROM facts
+    WHERE id_region IN (SELECT id_region FROM "Region" WHERE id_area = %s)
+    GROUP BY GROUPING SETS ((id_region), (id_branch), (id_cluster), ())
+'''
+
+
+def fetch_area_rollup(id_area, year, month):
+    """Ambil total usage dan marketing fee per region, branch dan cluster dalam satu query.
+
+    Hasilnya dict {level: {id: {'usage': ..., 'fee': ...}}}, level total memakai key None.
+    """
+    start, end = month_range(year, month)
+    with connection.cursor() as cursor:
+        cursor.execute(AREA_ROLLUP_SQL, [start, end, start, end, id_area])
+        rows = cursor.fetchall()
+
+    totals = {LEVEL_REGION: {}, LEVEL_BRANCH: {}, LEVEL_CLUSTER: {}, LEVEL_TOTAL: {}}
+    for id_region, id_branch, id_cluster, level, usage, fee in rows:
+        key = {
+            LEVEL_REGION: id_region,
+            LEVEL_BRANCH: id_branch,
+            LEVEL_CLUSTER: id_cluster,
+            LEVEL_TOTAL: None,
+        }.get(level)
+        if level in totals:
+            totals[level][key] = {'usage': usage, 'fee': fee}
+    return totals
+
+
+def build_area_rollup(id_area, year, month):
+    """Susun data regions[].branches[].clusters[] untuk dashboard admin area.
+
+    Hirarki diambil dari data referensi di memori, jadi hanya rollup yang menyentuh
+    database berapapun jumlah cluster-nya.
+    """
+    totals = fetch_area_rollup(id_area, year, month)
+    empty = {'usage': 0, 'fee': 0}
+    hierarchy = get_refdata()
+
+    region_data = []
+    for id_region in hierarchy.regions_by_area.get(id_area, []):
+        branch_data = []
+        for id_branch in hierarchy.branches_by_region.get(id_region, []):
+            cluster_data = [{
+                "id_cluster": id_cluster,
+                "name": hierarchy.clusters[id_cluster]['name'],
+                "total_usage": totals[LEVEL_CLUSTER].get(id_cluster, empty)['usage']
+            } for id_cluster in hierarchy.clusters_by_branch.get(id_branch, [])]
+
+            branch_data.append({
+                "id_branch": id_branch,
+                "name": hierarchy.branches[id_branch]['name'],
+                "total_usage": totals[LEVEL_BRANCH].get(id_branch, empty)['usage'],
+                "clusters": cluster_data
+            })
+
+        region_totals = totals[LEVEL_REGION].get(id_region, empty)
+        region_usage = region_totals['usage']
+        region_marketing_fee = region_totals['fee']
+        region_data.append({
+            "id_region": id_region,
+            "name": hierarchy.regions[id_region]['name'],
+            "total_marketing_fee": region_marketing_fee,
+            "total_usage": region_usage,
+            "usage_percentage": (region_usage / region_marketing_fee * 100) if region_marketing_fee > 0 else 0,
+            "branches": branch_data
+        })
+
+    return {
+        "total": totals[LEVEL_TOTAL].get(None, empty),
+        "regions": region_data
+    }
@@ -0,0 +1,167 @@
+from datetime import datetime
+from django.db.models import FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from myapp.models import Cluster, Marketingfee, Report, User
+from myapp.refdata import poin_types
+from myapp.periods import month_range, parse_month, period_filter
+from myapp.timeseries import bucket_label, report_series
+
+# Ringkasan cluster/branch/region yang dulu diambil view lewat HTTP ke server sendiri
+# (http://127.0.0.1:8000/api/admin/...). Sekarang dipanggil langsung sebagai fungsi.
+
+
+def _period_filter(month, year):
+    if month and year:
+        return period_filter(year, parse_month(month))
+    return {}
+
+
+def cluster_summaries(cluster_ids, month=None, year=None):
+    """Usage dan marketing fee untuk banyak cluster sekaligus dalam satu query.
+
+    Tanpa month/year, total dihitung dari seluruh periode.
+    """
+    period = _period_filter(month, year)
+
+    usage = Report.objects.filter(
+        id_user__id_cluster=OuterRef('id_cluster'),
+        **period
+    ).values('id_user__id_cluster').annotate(total=Sum('amount_used')).values('total')
+
+    fee = Marketingfee.objects.filter(
+        id_user__id_cluster=OuterRef('id_cluster'),
+        **period
+    ).values('id_user__id_cluster').annotate(total=Sum('total')).values('total')
+
+    rows = Cluster.objects.filter(id_cluster__in=cluster_ids).annotate(
+        total_fee=Coalesce(Subquery(usage, output_field=FloatField()), 0.0),
+        marketing_fee_total=Coalesce(Subquery(fee, output_field=FloatField()), 0.0)
+    ).values('id_cluster', 'total_fee', 'marketing_fee_total')
+
+    return {
+        row['id_cluster']: {
+            "marketing_fee_total": row['marketing_fee_total'],
+            "total_fee": row['total_fee'],
+            "fee_balance": row['marketing_fee_total'] - row['total_fee']
+        }
+        for row in rows
+    }
+
+
+def cluster_summary(id_cluster, month=None, year=None):
+    empty = {"marketing_fee_total": 0, "total_fee": 0, "fee_balance": 0}
+    return cluster_summaries([id_cluster], month, year).get(int(id_cluster), empty)
+
+
+def cluster_detail(id_cluster, month, year, id_poin=None):
+    """Breakdown per poin dan data harian satu cluster pada bulan tertentu.
+
+    Raise User.DoesNotExist jika admin cluster tidak ditemukan. Tahun kosong atau
+    bukan angka memakai tahun sekarang.
+    """
+    year = int(year) if year and str(year).isdigit() else datetime.now().year
+    admin_cluster = User.objects.get(
+        id_cluster=id_cluster,
+        id_role__in=[4, 5]  # Role 4,5 untuk admin cluster
+    )
+
+    reports = Report.objects.filter(
+        id_user__id_cluster=id_cluster,
+        **period_filter(year, parse_month(month))
+    )
+    if id_poin:
+        reports = reports.filter(id_poin=id_poin)
+
+    poin_totals = {
+        row['id_poin']: row['total']
+        for row in reports.values('id_poin').annotate(total=Sum('amount_used'))
+    }
+
+    report_data = []
+    total_amount = 0
+    for poin in poin_types():
+        poin_total = poin_totals.get(poin['id_poin']) or 0
+        if poin_total > 0:
+            total_amount += poin_total
+            report_data.append({
+                'id_poin': poin['id_poin'],
+                'type': poin['type'],
+                'total_amount': poin_total,
+                'percentage': 0
+            })
+
+    if total_amount > 0:
+        for item in report_data:
+            item['percentage'] = (item['total_amount'] / total_amount) * 100
+
+    # Total per hari, semua hari dalam bulan (hari tanpa report bernilai 0)
+    series = report_series(
+        *month_range(year, parse_month(month)), 'day',
+        cluster_ids=[int(id_cluster)], poin_id=id_poin
+    )
+    monthly_data = [{
+        'date': bucket_label(bucket, 'day'),
+        'amount': total
+    } for bucket, total, _ in series]
+
+    return {
+        'data_admin': {
+            'username': admin_cluster.username,
+            'id_user': admin_cluster.id_user
+        },
+        'report_data': report_data,
+        'monthly_data': monthly_data,
+        'total_amount': total_amount
+    }
+
+
+def branch_summary(id_branch_admin, month=None, year=None):
+    """Ringkasan semua cluster di bawah admin branch, raise User.DoesNotExist jika tidak ada."""
+    branch_admin = User.objects.get(id_user=id_branch_admin, id_role__in=[3])
+
+    cluster_admins = list(User.objects.filter(
+        id_branch=branch_admin.id_branch,
+        id_role=5
+    ).values('id_user', 'username', 'id_cluster'))
+
+    summaries = cluster_summaries(
+        [admin['id_cluster'] for admin in cluster_admins if admin['id_cluster']],
+        month,
+        year
+    )
+
+    cluster_summary_data = []
+    for admin in cluster_admins:
+        summary = summaries.get(admin['id_cluster'])
+        if summary is None:
+            cluster_summary_data.append({"id_cluster": admin['id_cluster'], "error": "Cluster not found"})
+            continue
+
+        cluster_summary_data.append({
+            "id_cluster": admin['id_cluster'],
+            "id_user": admin['id_user'],
+            "username": admin['username'],
+            **summary
+        })
+
+    return {
+        "data_admin": {
+            "id_user": branch_admin.id_user,
+            "username": branch_admin.username,
+        },
+        "cluster_summary": cluster_summary_data,
+    }
+
+
+def region_summary(id_region_admin):
+    """Daftar admin branch di bawah admin region, raise User.DoesNotExist jika tidak ada."""
+    region_admin = User.objects.get(id_user=id_region_admin, id_role__in=[2])
+    list_branch = list(User.objects.filter(id_region=region_admin.id_region, id_role=3).values('id_user', 'username'))
+
+    return {
+        "data_admin": {
+            "id_user": region_admin.id_user,
+            "username": region_admin.username
+        },
+        "list_branch": list_branch
+    }
@@ -0,0 +1,37 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from myapp.models import Area, Region, Branch, Cluster, Poin, Role, User, Report, Marketingfee, Recommendation
+from myapp import refdata, dashboard_cache, middleware
+
+
+@receiver([post_save, post_delete], sender=Area)
+@receiver([post_save, post_delete], sender=Region)
+@receiver([post_save, post_delete], sender=Branch)
+@receiver([post_save, post_delete], sender=Cluster)
+@receiver([post_save, post_delete], sender=Poin)
+@receiver([post_save, post_delete], sender=Role)
+def invalidate_refdata(sender, **kwargs):
+    transaction.on_commit(refdata.invalidate)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cluster_users(sender, instance, **kwargs):
+    # Hanya user cluster (id_role=6) yang ikut disimpan di data referensi
+    if instance.id_role_id == 6 or instance.id_cluster_id is not None:
+        transaction.on_commit(refdata.invalidate)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_principal(sender, instance, **kwargs):
+    # Role/scope di principal yang di-cache middleware bisa berubah
+    transaction.on_commit(lambda: middleware.forget_user(instance.id_user))
+
+
+@receiver([post_save, post_delete], sender=Report)
+@receiver([post_save, post_delete], sender=Marketingfee)
+@receiver([post_save, post_delete], sender=Recommendation)
+def invalidate_dashboards(sender, instance, **kwargs):
+    # Approve dan submit marketing fee memakai update()/SQL langsung, jadi
+    # memanggil dashboard_cache.invalidate_users sendiri.
+    dashboard_cache.invalidate_users([instance.id_user_id])
@@ -0,0 +1,129 @@
+from io import BytesIO
+from pathlib import Path
+from django.conf import settings
+from django.db import connection, transaction
+from myapp.models import Report
+
+# Thumbnail evidence dibuat di background (manage.py process_thumbnails), bukan saat
+# upload. Report dengan thumbnails NULL adalah antrian-nya; setelah diproses kolom
+# itu berisi {ukuran: url}, atau {} jika file tidak bisa dibuatkan thumbnail.
+THUMBNAIL_SIZES = (160, 480)  # sisi terpanjang dalam pixel
+QUALITY = 75
+THUMBNAIL_DIR = Path(settings.MEDIA_ROOT) / "thumbs"
+LOCK_TIMEOUT = 600  # detik, report yang diproses lebih lama dari ini dianggap worker-nya mati
+
+
+def media_path(url):
+    return Path(settings.MEDIA_ROOT) / Path(url.replace(settings.MEDIA_URL, "", 1))
+
+
+def _open_source(path):
+    from PIL import Image
+
+    if path.suffix.lower() != '.pdf':
+        return Image.open(path)
+
+    # Halaman pertama PDF, butuh PyMuPDF
+    try:
+        import fitz
+    except ImportError:
+        print("PyMuPDF is not installed, PDF thumbnails are postponed")
+        return None
+    with fitz.open(path) as document:
+        pixmap = document[0].get_pixmap(dpi=72)
+        return Image.open(BytesIO(pixmap.tobytes('png')))
+
+
+def _output_format():
+    from PIL import features
+    return ('WEBP', '.webp') if features.check('webp') else ('JPEG', '.jpg')
+
+
+def make_thumbnails(image_url):
+    """Buat thumbnail semua ukuran untuk satu file, hasilnya {ukuran: url}.
+
+    Hasilnya None jika file belum bisa diproses (PDF tanpa PyMuPDF), supaya report
+    tetap di antrian dan dicoba lagi nanti.
+    """
+    from PIL import Image, ImageOps
+
+    source = _open_source(media_path(image_url))
+    if source is None:
+        return None
+
+    image_format, extension = _output_format()
+    THUMBNAIL_DIR.mkdir(parents=True, exist_ok=True)
+    stem = Path(image_url).stem
+
+    with source:
+        # Foto dari HP sering menyimpan orientasi di EXIF
+        image = ImageOps.exif_transpose(source).convert('RGB')
+        thumbnails = {}
+        for size in THUMBNAIL_SIZES:
+            thumbnail = image.copy()
+            thumbnail.thumbnail((size, size), Image.LANCZOS)
+            file_name = f"{stem}_{size}{extension}"
+            thumbnail.save(THUMBNAIL_DIR / file_name, image_format, quality=QUALITY, optimize=True)
+            thumbnails[str(size)] = f"{settings.MEDIA_URL}thumbs/{file_name}"
+    return thumbnails
+
+
+def delete_thumbnails(thumbnails):
+    for url in (thumbnails or {}).values():
+        path = media_path(url)
+        if path.exists():
+            path.unlink()
+
+
+def claim_pending(limit):
+    """Tandai report yang belum punya thumbnail sebagai sedang diproses.
+
+    Transaksinya hanya sepanjang UPDATE ini, jadi pembuatan thumbnail (yang bisa
+    lama untuk PDF) tidak menahan lock baris Report atau koneksi database. Report
+    yang tertahan lebih dari LOCK_TIMEOUT (worker mati) diambil ulang.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute('''
+                UPDATE "Report" SET thumbnail_locked_at = now()
+                WHERE id IN (
+                    SELECT id FROM "Report"
+                    WHERE thumbnails IS NULL AND image_url IS NOT NULL
+                      AND (thumbnail_locked_at IS NULL
+                           OR thumbnail_locked_at < now() - %s * interval '1 second')
+                    ORDER BY id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, image_url
+            ''', [LOCK_TIMEOUT, limit])
+            return cursor.fetchall()
+
+
+def process_pending(limit):
+    """Buat thumbnail untuk report yang belum diproses, hasilnya jumlah report.
+
+    Beberapa worker bisa jalan bersamaan tanpa mengerjakan report yang sama.
+    """
+    rows = claim_pending(limit)
+    for id_report, image_url in rows:
+        try:
+            thumbnails = make_thumbnails(image_url)
+        except Exception as e:
+            print(f"Thumbnail error for report {id_report}: {str(e)}")
+            thumbnails = {}
+
+        if thumbnails is None:
+            # Tetap NULL; thumbnail_locked_at membuatnya baru dicoba lagi setelah LOCK_TIMEOUT
+            continue
+
+        updated = Report.objects.filter(id=id_report, thumbnails__isnull=True).update(
+            thumbnails=thumbnails,
+            thumbnail_locked_at=None
+        )
+        # Report dihapus selama thumbnail dibuat: buang thumbnail-nya, kecuali file
+        # evidence yang sama masih dipakai report lain
+        if not updated and not Report.objects.filter(image_url=image_url).exists():
+            delete_thumbnails(thumbnails)
+
+    return len(rows)
@@ -0,0 +1,92 @@
+from datetime import timedelta
+from django.db import connection
+from django.utils import timezone
+from myapp.periods import MONTHS
+
+# Seri waktu pemakaian (SUM amount_used per hari/minggu/bulan) dihitung di database:
+# report dikelompokkan dengan date_trunc lalu di-LEFT JOIN ke generate_series, jadi
+# bucket tanpa report tetap ada dengan nilai 0 dan hanya 12/31 baris yang keluar
+# dari database, berapapun jumlah report-nya.
+GRANULARITIES = ('day', 'week', 'month')
+
+# Batas rentang per granularity supaya satu request tidak menghasilkan ribuan bucket
+MAX_SPAN = {
+    'day': timedelta(days=366),
+    'week': timedelta(weeks=260),
+    'month': timedelta(days=3660),
+}
+
+MONTH_NAMES = {number: name for name, number in MONTHS.items()}
+
+SERIES_SQL = '''
+    WITH totals AS (
+        SELECT date_trunc(%(granularity)s, time AT TIME ZONE %(tz)s) AS bucket,
+               SUM(amount_used) AS total,
+               COUNT(*) AS report_count
+        FROM "Report"
+        WHERE time >= %(start)s AND time < %(end)s AND {condition}
+        GROUP BY 1
+    )
+    SELECT buckets.bucket, COALESCE(totals.total, 0), COALESCE(totals.report_count, 0)
+    FROM generate_series(
+        date_trunc(%(granularity)s, %(start)s AT TIME ZONE %(tz)s),
+        (%(end)s AT TIME ZONE %(tz)s) - interval '1 microsecond',
+        %(step)s::interval
+    ) AS buckets(bucket)
+    LEFT JOIN totals ON totals.bucket = buckets.bucket
+    ORDER BY buckets.bucket
+'''
+
+
+def report_series(start, end, granularity, cluster_ids=None, user_ids=None, poin_id=None):
+    """Total amount_used dan jumlah report per bucket dalam [start, end).
+
+    Report dipilih lewat `cluster_ids` atau `user_ids`, opsional hanya satu poin.
+    Hasilnya list (awal bucket dalam waktu lokal, total, jumlah report), urut dan
+    lengkap tanpa bucket yang bolong.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f'Invalid granularity: {granularity}')
+    if end <= start or end - start > MAX_SPAN[granularity]:
+        raise ValueError(f'Invalid range for {granularity} series')
+
+    params = {
+        'granularity': granularity,
+        'step': f'1 {granularity}',
+        'tz': timezone.get_current_timezone_name(),
+        'start': start,
+        'end': end,
+    }
+    if cluster_ids is not None:
+        condition = 'id_user IN (SELECT id_user FROM "User" WHERE id_cluster = ANY(%(ids)s))'
+        params['ids'] = list(cluster_ids)
+    else:
+        condition = 'id_user = ANY(%(ids)s)'
+        params['ids'] = [int(id_user) for id_user in user_ids]
+    if poin_id is not None:
+        condition += ' AND id_poin = %(poin_id)s'
+        params['poin_id'] = int(poin_id)
+
+    with connection.cursor() as cursor:
+        cursor.execute(SERIES_SQL.format(condition=condition), params)
+        return [(bucket, float(total), report_count) for bucket, total, report_count in cursor.fetchall()]
+
+
+def bucket_label(bucket, granularity):
+    if granularity == 'month':
+        return MONTH_NAMES[bucket.month]
+    return bucket.strftime('%d %B %Y')
+
+
+def chart_data(series, granularity, label):
+    """Format seri untuk chart di frontend (labels + satu dataset)."""
+    return {
+        'labels': [bucket_label(bucket, granularity) for bucket, _, _ in series],
+        'datasets': [{
+            'label': label,
+            'data': [total for _, total, _ in series],
+            'borderColor': '#FF4B2B',
+            'backgroundColor': 'rgba(255, 75, 43, 0.1)',
+            'tension': 0.4
+        }]
+    }
@@ -0,0 +1,73 @@
+from django.db import connection
+from django.utils import timezone
+
+# Satu statement untuk menerapkan banyak delta sekaligus ke tabel ringkasan
+UPSERT_SQL = '''
+    INSERT INTO "MonthlyUsage" (id_user, id_poin, year, month, total_amount, report_count, pending_count)
+    VALUES {values}
+    ON CONFLICT (id_user, id_poin, year, month) DO UPDATE SET
+        total_amount = "MonthlyUsage".total_amount + EXCLUDED.total_amount,
+        report_count = "MonthlyUsage".report_count + EXCLUDED.report_count,
+        pending_count = "MonthlyUsage".pending_count + EXCLUDED.pending_count
+'''
+
+
+def _period_of(time):
+    # Ikuti timezone yang dipakai filter periode (myapp.periods)
+    local_time = timezone.localtime(time) if timezone.is_aware(time) else time
+    return local_time.year, local_time.month
+
+
+def apply_deltas(deltas):
+    """Terapkan delta {(id_user, id_poin, year, month): [amount, count, pending]}.
+
+    Harus dipanggil di dalam transaksi yang sama dengan perubahan di tabel Report.
+    """
+    rows = [
+        (id_user, id_poin, year, month, amount, count, pending)
+        for (id_user, id_poin, year, month), (amount, count, pending) in deltas.items()
+        if amount or count or pending
+    ]
+    if not rows:
+        return
+
+    values = ', '.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(rows))
+    params = [value for row in rows for value in row]
+    with connection.cursor() as cursor:
+        cursor.execute(UPSERT_SQL.format(values=values), params)
+
+
+def _add_delta(deltas, id_user, id_poin, time, amount, count, pending):
+    if not id_user or not id_poin or not time:
+        return
+    key = (int(id_user), int(id_poin), *_period_of(time))
+    delta = deltas.setdefault(key, [0.0, 0, 0])
+    delta[0] += amount
+    delta[1] += count
+    delta[2] += pending
+
+
+def record_report_created(report):
+    deltas = {}
+    _add_delta(
+        deltas, report.id_user_id, report.id_poin_id, report.time,
+        float(report.amount_used or 0), 1, 0 if report.status else 1
+    )
+    apply_deltas(deltas)
+
+
+def record_report_deleted(report):
+    deltas = {}
+    _add_delta(
+        deltas, report.id_user_id, report.id_poin_id, report.time,
+        -float(report.amount_used or 0), -1, 0 if report.status else -1
+    )
+    apply_deltas(deltas)
+
+
+def record_reports_approved(rows):
+    """rows berisi tuple (id_user, id_poin, time) dari laporan pending yang baru di-approve."""
+    deltas = {}
+    for id_user, id_poin, time in rows:
+        _add_delta(deltas, id_user, id_poin, time, 0.0, 0, -1)
+    apply_deltas(deltas)
@@ -0,0 +1,26 @@
+from django.db import connection
+
+# Rentang id_user per role, dipakai juga untuk menentukan role saat login.
+# Tiap role punya sequence Postgres sendiri (lihat migration 0009) sehingga id
+# berikutnya didapat dengan satu nextval, aman walaupun ada registrasi bersamaan.
+ROLE_ID_RANGES = {
+    1: (1000, 1999),  # admin area
+    2: (2000, 2999),  # admin region
+    3: (3000, 3999),  # admin branch
+    4: (4000, 4999),  # admin cluster mcot
+    5: (5000, 5999),  # admin cluster gm
+    6: (6001, 9223372036854775807),  # user cluster
+}
+
+
+def sequence_name(id_role):
+    return f'user_id_role_{id_role}_seq'
+
+
+def allocate_user_id(id_role):
+    """Ambil id_user berikutnya untuk role ini dari sequence-nya."""
+    if id_role not in ROLE_ID_RANGES:
+        raise ValueError(f'Unknown role: {id_role}')
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT nextval(%s)', [sequence_name(id_role)])
+        return cursor.fetchone()[0]
@@ -0,0 +1,28 @@
+import time
+from datetime import datetime, timezone as dt_timezone
+from django.core.cache import cache
+
+# Versi data (refdata dan scope dashboard) disimpan di Django cache. Nilainya
+# timestamp nanodetik saat terakhir di-bump, bukan counter dari 0: jika cache
+# kosong (restart, locmem di-cull) versi diinisialisasi ke waktu sekarang, jadi
+# versi/ETag lama tidak akan pernah cocok lagi dengan data yang sudah berubah.
+# Versi juga kedaluwarsa setelah MAX_AGE: dengan locmem tiap proses punya versi
+# sendiri dan bump di proses lain tidak terlihat, jadi umur data basi tetap terbatas.
+MAX_AGE = 300  # detik
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), MAX_AGE)
+        version = cache.get(key, 0)
+    return version
+
+
+def bump_version(key):
+    cache.set(key, max(time.time_ns(), (cache.get(key) or 0) + 1), MAX_AGE)
+
+
+def version_datetime(version):
+    """Waktu (UTC) sebuah versi, dipakai untuk header Last-Modified."""
+    return datetime.fromtimestamp(version / 1e9, tz=dt_timezone.utc)